@@ -0,0 +1,126 @@
+"""
+Times the leaderboard and score queries against a synthetic database, with
+and without the indexes added by utility/migrations.py.
+
+    python -m benchmarks.leaderboard_queries [--participants 120000] [--users 5000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utility import db_helpers
+from utility.migrations import rebuild_score_aggregates
+
+
+def populate(path: str, users: int, participants: int) -> None:
+    rng = random.Random(1234)
+    now = datetime.utcnow()
+
+    def stamp() -> str:
+        return (now - timedelta(seconds=rng.randint(0, 90 * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users (discord_id, cf_handle, problems_solved) VALUES (?, ?, ?)",
+        ((str(10**17 + i), f"handle_{i}", rng.randint(0, 500)) for i in range(users))
+    )
+    contests = max(1, participants // 50)
+    conn.executemany(
+        "INSERT INTO contests (name, duration, start_time, status, contest_type) VALUES (?, ?, ?, ?, ?)",
+        ((f"Contest {i}", 120, stamp(), "ENDED" if i < contests - 3 else "PENDING", "bot") for i in range(contests))
+    )
+    # Each contest gets 50 distinct participants
+    conn.executemany(
+        "INSERT INTO contest_participants (contest_id, user_id, score, joined_at) VALUES (?, ?, ?, ?)",
+        ((c + 1, u + 1, rng.randint(0, 60), stamp())
+         for c in range(contests) for u in rng.sample(range(users), min(50, users)))
+    )
+    challenges = participants // 4
+    conn.executemany(
+        "INSERT INTO challenges (problem_id, created_at) VALUES (?, ?)",
+        ((f"{i}A", stamp()) for i in range(challenges))
+    )
+    conn.executemany(
+        "INSERT INTO challenge_participants (challenge_id, user_id, score_awarded, joined_at) VALUES (?, ?, ?, ?)",
+        ((c + 1, u + 1, rng.randint(0, 30), stamp())
+         for c in range(challenges) for u in rng.sample(range(users), 2))
+    )
+    conn.commit()
+    # Production databases get statistics from the migration's ANALYZE and PRAGMA optimize on close
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+QUERIES = [
+    ("leaderboard overall", lambda: db_helpers.get_custom_leaderboard("overall")),
+    ("leaderboard monthly", lambda: db_helpers.get_custom_leaderboard("monthly")),
+    ("leaderboard weekly", lambda: db_helpers.get_custom_leaderboard("weekly")),
+    ("leaderboard daily", lambda: db_helpers.get_custom_leaderboard("daily")),
+    ("contest leaderboard overall", lambda: db_helpers.get_contest_custom_leaderboard("overall")),
+    ("contest leaderboard weekly", lambda: db_helpers.get_contest_custom_leaderboard("weekly")),
+    ("user score", lambda: db_helpers.get_user_score(str(10**17 + 42))),
+    ("pending/active contests", lambda: db_helpers.get_pending_and_active_contests()),
+]
+
+
+async def time_queries(repeat: int) -> dict:
+    results = {}
+    for name, query in QUERIES:
+        await query()  # warm the page cache
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await query()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(samples)
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, default=120_000, help="contest participant rows to generate")
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_helpers.DB_PATH = os.path.join(tmp, "db", "bench.db")
+        await db_helpers.init_db()
+        print(f"Generating {args.participants} contest participant rows...")
+        populate(db_helpers.DB_PATH, args.users, args.participants)
+
+        await db_helpers.open_pool()
+        try:
+            async with db_helpers._write_db() as db:
+                await rebuild_score_aggregates(db)
+                await db.commit()
+            indexed = await time_queries(args.repeat)
+
+            # Drop the migration indexes to measure the full-scan baseline
+            conn = sqlite3.connect(db_helpers.DB_PATH)
+            names = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")]
+            for name in names:
+                conn.execute(f"DROP INDEX {name}")
+            conn.execute("ANALYZE")
+            conn.commit()
+            conn.close()
+            await db_helpers.close_pool()
+            await db_helpers.open_pool()
+
+            baseline = await time_queries(args.repeat)
+        finally:
+            await db_helpers.close_pool()
+
+    print(f"\n{'query':<30}{'no indexes (ms)':>18}{'indexed (ms)':>15}{'speedup':>10}")
+    for name, _ in QUERIES:
+        print(f"{name:<30}{baseline[name]:>18.2f}{indexed[name]:>15.2f}{baseline[name] / max(indexed[name], 1e-6):>9.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Measures mixed read/write throughput for each SQLite pragma profile in
+utility/db_pragmas.py, against a fresh dummy_data_gen.py-populated database.
+
+    python -m benchmarks.pragma_profiles [--seconds 10] [--readers 8] [--writers 4] [--profile wal]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import dummy_data_gen
+from utility import db_helpers
+from utility.db_pragmas import PRAGMA_PROFILES
+
+
+async def reader(deadline: float, latencies: list, discord_ids: list) -> None:
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        choice = rng.randrange(3)
+        if choice == 0:
+            await db_helpers.get_custom_leaderboard(rng.choice(["daily", "weekly", "monthly", "overall"]))
+        elif choice == 1:
+            await db_helpers.get_user_score(rng.choice(discord_ids))
+        else:
+            await db_helpers.get_challenge_history()
+        latencies.append(time.perf_counter() - start)
+
+
+async def writer(deadline: float, counter: list, user_ids: list) -> None:
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        challenge_id = await db_helpers.create_challenge(f"{rng.randint(1, 2000)}A")
+        await db_helpers.add_challenge_participant(challenge_id, rng.choice(user_ids), rng.randint(10, 100))
+        counter[0] += 2
+
+
+async def run_profile(name: str, args) -> dict:
+    os.environ["DB_PRAGMA_PROFILE"] = name
+    with tempfile.TemporaryDirectory() as tmp:
+        db_helpers.DB_PATH = os.path.join(tmp, "db", "db.db")
+        dummy_data_gen.DB_FILE = db_helpers.DB_PATH
+        await db_helpers.init_db()
+        await dummy_data_gen.generate_dummy_data()
+
+        await db_helpers.open_pool()
+        try:
+            async with db_helpers._read_db() as db:
+                rows = await (await db.execute("SELECT user_id, discord_id FROM users")).fetchall()
+            user_ids = [row['user_id'] for row in rows]
+            discord_ids = [row['discord_id'] for row in rows]
+
+            latencies, writes = [], [0]
+            deadline = time.perf_counter() + args.seconds
+            await asyncio.gather(
+                *(reader(deadline, latencies, discord_ids) for _ in range(args.readers)),
+                *(writer(deadline, writes, user_ids) for _ in range(args.writers)),
+            )
+        finally:
+            await db_helpers.close_pool()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies) / args.seconds,
+        "writes": writes[0] / args.seconds,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each run")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--profile", action="append", choices=sorted(PRAGMA_PROFILES), help="profile(s) to run (default: all)")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.profile or PRAGMA_PROFILES:
+        print(f"--- profile: {name} ---")
+        results[name] = await run_profile(name, args)
+
+    print(f"\n{'profile':<14}{'reads/s':>10}{'writes/s':>10}{'read p50 (ms)':>15}{'read p95 (ms)':>15}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['reads']:>10.0f}{r['writes']:>10.0f}{r['p50']:>15.2f}{r['p95']:>15.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
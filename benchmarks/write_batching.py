@@ -0,0 +1,62 @@
+"""
+Compares commit throughput of one-commit-per-write against the write-behind
+queue in utility/db_helpers.py, using concurrent challenge score writes.
+
+    python -m benchmarks.write_batching [--writes 2000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from utility import db_helpers
+
+
+async def seed(users: int) -> int:
+    async with db_helpers._write_db() as db:
+        await db.executemany(
+            "INSERT INTO users (discord_id, cf_handle) VALUES (?, ?)",
+            ((str(i), f"handle_{i}") for i in range(users))
+        )
+        await db.commit()
+    return await db_helpers.create_challenge("1A")
+
+
+async def commit_per_write(challenge_id: int, user_id: int) -> None:
+    async with db_helpers._write_db() as db:
+        await db.execute(
+            "INSERT INTO challenge_participants (challenge_id, user_id, score_awarded) VALUES (?, ?, ?)",
+            (challenge_id, user_id, 10)
+        )
+        await db_helpers._add_to_score_aggregates(db, user_id, challenge_points=10)
+        await db.commit()
+
+
+async def run(label: str, writes: int, write) -> None:
+    challenge_id = await db_helpers.create_challenge("1A")
+    start = time.perf_counter()
+    await asyncio.gather(*(write(challenge_id, user_id) for user_id in range(1, writes + 1)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22}{writes:>8} writes in {elapsed:7.2f}s  = {writes / elapsed:9.0f} commits/s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=2_000, help="concurrent writes per run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_helpers.DB_PATH = os.path.join(tmp, "db", "bench.db")
+        await db_helpers.init_db()
+        await db_helpers.open_pool()
+        try:
+            await seed(args.writes)
+            await run("commit per write", args.writes, commit_per_write)
+            await run("write-behind queue", args.writes, db_helpers.add_challenge_participant)
+        finally:
+            await db_helpers.close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,6 +9,9 @@ import asyncio
 import aiohttp
 import inspect
 from utility import db_helpers
+from utility.random_problems import problemset_index
+from utility.codeforces_client import CodeforcesClient
+from utility.command_sync import sync_command_tree
 
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
@@ -19,6 +22,7 @@ class MyBot(commands.Bot):
         intents.message_content = True
         intents.members = True
         super().__init__(command_prefix="!", intents=intents)
+        self.commands_checked = False
         
         # Dynamic cog loading with recursive directory search
         self.initial_extensions = []
@@ -33,10 +37,16 @@ class MyBot(commands.Bot):
 
     async def setup_hook(self):
         self.session = aiohttp.ClientSession()
+        # Every Codeforces API call goes through this client's rate limiter
+        self.cf_client = CodeforcesClient(self.session)
         
         # Initialize database
         await db_helpers.init_db()
+        await db_helpers.open_pool()
         print("✅ Database initialized")
+
+        # Serve problem picks from the local snapshot while a fresh copy downloads
+        await problemset_index.warm_up(self.cf_client)
         
         for extension in self.initial_extensions:
             try:
@@ -45,31 +55,42 @@ class MyBot(commands.Bot):
             except Exception as e:
                 print(f"❌ Failed to load extension {extension}: {e}")
         
-        # Initial sync will happen in on_ready with delay
+        # Commands are synced in on_ready if the tree changed
         print("Initial setup complete, will sync commands after bot is ready")
         
     async def close(self):
+        if hasattr(self, 'cf_client'):
+            await self.cf_client.close()
         if hasattr(self, 'session'):
             await self.session.close()
+        # Unloads the cogs first so they can still write their final state
         await super().close()
+        await db_helpers.close_pool()
 
     async def on_ready(self):
         print(f"Bot is online as {self.user.name}")
         await self.change_presence(activity=discord.Game(name="/help"))
 
-        # Delay sync to ensure all cogs are fully loaded
-        await asyncio.sleep(2)
-        
-        # Force sync to ensure all new commands are registered
-        await self.tree.sync()
+        # on_ready fires again on every gateway reconnect; the tree only needs checking once
+        if self.commands_checked:
+            return
+        self.commands_checked = True
 
-        # Improved command logging
-        registered_commands = await self.tree.fetch_commands()
-        command_names = [cmd.name for cmd in registered_commands]
-        command_names.sort()
+        # Cogs are all loaded in setup_hook, so the tree is complete here.
+        # Only upload it when its fingerprint differs from the last sync.
+        try:
+            synced = await sync_command_tree(self.tree)
+        except Exception as e:
+            self.commands_checked = False
+            print(f"Failed to sync commands: {e}")
+            return
+
+        if synced is None:
+            print("Command tree unchanged, skipping sync")
+            return
 
-        print("Registered commands:")
-        for cmd_name in command_names:
+        print("Synced commands:")
+        for cmd_name in sorted(cmd.name for cmd in synced):
             print(f"  - {cmd_name}")
 
     async def on_member_join(self, member):
@@ -142,7 +163,7 @@ async def sync(ctx):
     """Sync the application commands with Discord."""
     await ctx.send("Syncing commands...")
     try:
-        synced = await bot.tree.sync()
+        synced = await sync_command_tree(bot.tree, force=True)
         await ctx.send(f"Synced {len(synced)} commands!")
         
         # Print the names of synced commands for debugging
@@ -177,7 +198,7 @@ async def force_sync(ctx):
     
     # Clear and resync commands
     bot.tree.clear_commands(guild=None)
-    synced = await bot.tree.sync()
+    synced = await sync_command_tree(bot.tree, force=True)
     
     # Print the synced commands
     command_names = [cmd.name for cmd in synced]
@@ -1,23 +1,30 @@
 from datetime import datetime
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 from typing import Dict, Optional
 import discord
-import aiohttp
 import re
 import time
-from utility.random_problems import get_random_problem
+from utility.codeforces_client import CodeforcesClient
+from utility.random_problems import get_random_problem, get_problem_names
+from utility.submission_store import submission_store
+from utility.solved_sync import solved_problems_sync, SYNC_INTERVAL_SECONDS
+from utility.leaderboard_cache import leaderboard_cache
 from utility.config_manager import get_challenge_channel_id
 from utility.db_helpers import (
-    get_cf_handle,
+    get_cf_handles,
     get_custom_leaderboard,
     create_challenge,
     add_challenge_participant,
-    get_user_by_discord,
+    get_users_by_discord_ids,
     get_challenge_history,
     get_user_challenge_history,
     increment_user_problems_solved,
-    get_challenge_details 
+    get_challenge_details,
+    create_challenge_session,
+    get_active_challenge_sessions,
+    update_challenge_session_participant,
+    end_challenge_session
 )
 
 
@@ -32,28 +39,13 @@ def _parse_contest_and_index_from_link(link: str) -> Optional[Dict[str, str]]:
         "link": link
     }
 
-async def _cf_check_solved(session: aiohttp.ClientSession, handle: str, contest_id: int, index: str, since_ts: int) -> Optional[Dict]:
+async def _cf_check_solved(client: CodeforcesClient, handle: str, contest_id: int, index: str, since_ts: int) -> Optional[Dict]:
     """
     Checks if a user has solved a problem since a certain timestamp.
     Returns the submission object if solved, otherwise None.
     """
-    url = f"https://codeforces.com/api/contest.status?contestId={contest_id}&handle={handle}"
     try:
-        async with session.get(url) as resp:
-            data = await resp.json()
-            
-        if data.get("status") != "OK":
-            return None
-
-        for sub in data["result"]:
-            if sub.get("verdict") != "OK":
-                continue
-            prob = sub.get("problem", {})
-            if prob.get("contestId") == contest_id and prob.get("index") == index:
-                # Only count solves after challenge was created
-                if sub.get("creationTimeSeconds", 0) >= since_ts:
-                    return sub # Return the submission object
-        return None
+        return await submission_store.find_solve(client, handle, contest_id, index, since_ts)
     except Exception as e:
         print(f"Error checking CF problem solved: {e}")
         return None
@@ -63,13 +55,41 @@ async def _cf_check_solved(session: aiohttp.ClientSession, handle: str, contest_
 class Challenges(commands.GroupCog, name = "challenge"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+
+    async def cog_load(self):
+        """Re-attach the solve buttons of every challenge that was running before a restart."""
+        sessions = await get_active_challenge_sessions()
+        for session in sessions:
+            self.bot.add_view(self._SolveView.from_session(session, self.bot, self), message_id=session['message_id'])
+        if sessions:
+            print(f"Restored {len(sessions)} active challenge(s)")
+        self.solved_sync.start()
+
+    async def cog_unload(self):
+        self.solved_sync.cancel()
+
+    @tasks.loop(seconds=SYNC_INTERVAL_SECONDS)
+    async def solved_sync(self):
+        """Keep every linked user's Problems Solved count in line with Codeforces."""
+        try:
+            stats = await solved_problems_sync.run(self.bot.cf_client)
+        except Exception as e:
+            print(f"Error syncing solved problems: {e}")
+            return
+        if stats['updated']:
+            print(f"Solved problems sync: {stats['refreshed']}/{stats['checked']} handles refreshed, {stats['updated']} updated")
+
+    @solved_sync.before_loop
+    async def before_solved_sync(self):
+        await self.bot.wait_until_ready()
     
     # The _SolveView class for tracking challenges
     class _SolveView(discord.ui.View):
-        def __init__(self, challenge_id, participants, handle_map, contest_id, index, started_ts, bot, cog, problem_name, problem_link, problem_rating):
+        def __init__(self, challenge_id, handle_map, contest_id, index, started_ts, bot, cog, problem_name, problem_link, problem_rating,
+                     finished=None, surrendered=None, finish_order=None):
             super().__init__(timeout=None)
             self.challenge_id = challenge_id
-            self.participants = set(user.id for user in participants)
+            self.participants = set(int(uid) for uid in handle_map)
             self.handle_map = handle_map
             self.contest_id = contest_id
             self.index = index
@@ -79,9 +99,33 @@ class Challenges(commands.GroupCog, name = "challenge"):
             self.problem_name = problem_name
             self.problem_link = problem_link
             self.problem_rating = problem_rating
-            self.finished = {} # Store user_id: points
-            self.surrendered = set()
-            self.finish_order = []
+            self.finished = finished or {} # Store user_id: points
+            self.surrendered = surrendered or set()
+            self.finish_order = finish_order or []
+            # Stable custom_ids so the view can be re-registered with bot.add_view after a restart
+            self.check_button.custom_id = f"challenge_check_{challenge_id}"
+            self.surrender.custom_id = f"challenge_surrender_{challenge_id}"
+
+        @classmethod
+        def from_session(cls, session: Dict, bot, cog):
+            """Rebuild a view from a row returned by get_active_challenge_sessions."""
+            participants = session['participants']
+            finishers = sorted((p for p in participants if p['state'] == 'FINISHED'), key=lambda p: p['finish_pos'] or 0)
+            return cls(
+                challenge_id=session['challenge_id'],
+                handle_map={p['discord_id']: p['cf_handle'] for p in participants},
+                contest_id=session['cf_contest_id'],
+                index=session['problem_index'],
+                started_ts=session['started_ts'],
+                bot=bot,
+                cog=cog,
+                problem_name=session['problem_name'],
+                problem_link=session['problem_link'],
+                problem_rating=session['problem_rating'],
+                finished={int(p['discord_id']): p['points'] for p in finishers},
+                surrendered={int(p['discord_id']) for p in participants if p['state'] == 'SURRENDERED'},
+                finish_order=[int(p['discord_id']) for p in finishers]
+            )
         
         @discord.ui.button(label="Check If Solved", style=discord.ButtonStyle.green)
         async def check_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -98,8 +142,7 @@ class Challenges(commands.GroupCog, name = "challenge"):
             
             handle = self.handle_map[user_id]
             
-            session = getattr(self.bot, "session", aiohttp.ClientSession())
-            accepted_submission = await _cf_check_solved(session, handle, self.contest_id, self.index, self.started_ts)
+            accepted_submission = await _cf_check_solved(self.bot.cf_client, handle, self.contest_id, self.index, self.started_ts)
             
             if accepted_submission:
                 if interaction.user.id not in self.finished:
@@ -114,6 +157,7 @@ class Challenges(commands.GroupCog, name = "challenge"):
                     self.finished[interaction.user.id] = points
 
                     await self._save_challenge_result(user_id, len(self.finish_order), points)
+                    await update_challenge_session_participant(self.challenge_id, user_id, 'FINISHED', points, len(self.finish_order))
                     
                     if interaction.user.id in self.surrendered:
                         self.surrendered.remove(interaction.user.id)
@@ -140,13 +184,14 @@ class Challenges(commands.GroupCog, name = "challenge"):
                     self.finish_order.remove(interaction.user.id)
             
             await self._save_challenge_result(str(interaction.user.id), None, 0, is_surrender=True)
+            await update_challenge_session_participant(self.challenge_id, str(interaction.user.id), 'SURRENDERED')
             await interaction.followup.send("You have surrendered this challenge.", ephemeral=True)
             await self._update_status(interaction)
         
         async def _save_challenge_result(self, discord_id: str, rank: int = None, points: int = 0, is_surrender: bool = False):
             """Save challenge result to database"""
             try:
-                user = await get_user_by_discord(discord_id)
+                user = (await get_users_by_discord_ids([discord_id])).get(discord_id)
                 if not user:
                     print(f"Warning: User {discord_id} not found in database, skipping challenge result save")
                     return
@@ -164,7 +209,8 @@ class Challenges(commands.GroupCog, name = "challenge"):
                 )
                 
                 if not is_surrender and rank is not None:
-                    await increment_user_problems_solved(discord_id)
+                    # Not counted again if they had already solved it before the challenge
+                    await increment_user_problems_solved(discord_id, self.contest_id, self.index, self.started_ts)
             except Exception as e:
                 print(f"Error saving challenge result: {e}")
         
@@ -208,6 +254,7 @@ class Challenges(commands.GroupCog, name = "challenge"):
                     winner_text = f"🎉 Challenge completed! Winner: **{winner_name}**"
                 
                 embed.add_field(name="🏆 Challenge Complete", value=winner_text, inline=False)
+                await end_challenge_session(self.challenge_id)
                 await interaction.channel.send(embed=embed)
             else:
                 await interaction.message.edit(embed=embed)
@@ -224,7 +271,7 @@ class Challenges(commands.GroupCog, name = "challenge"):
     async def challenge(self, interaction: discord.Interaction, members: str, tags: str = "random", rating: str = "random"):
         await interaction.response.defer()
         
-        challenger_user = await get_user_by_discord(str(interaction.user.id))
+        challenger_user = (await get_users_by_discord_ids([str(interaction.user.id)])).get(str(interaction.user.id))
         if not challenger_user:
             await interaction.followup.send("You need to authenticate with `/authenticate` before creating challenges.", ephemeral=True)
             return
@@ -237,14 +284,14 @@ class Challenges(commands.GroupCog, name = "challenge"):
             await interaction.followup.send("No valid members were found to challenge.", ephemeral=True)
             return
         
-        authenticated_members = [m for m in challenged_members if await get_user_by_discord(str(m.id))]
+        registered = await get_users_by_discord_ids([str(m.id) for m in challenged_members])
+        authenticated_members = [m for m in challenged_members if str(m.id) in registered]
         
         if not authenticated_members:
             await interaction.followup.send("None of the mentioned users are authenticated. They must use `/authenticate` first.", ephemeral=True)
             return
         
-        session = getattr(self.bot, "session", aiohttp.ClientSession())
-        problem = await get_random_problem(session, type_of_problem=tags, rating=rating)
+        problem = await get_random_problem(self.bot.cf_client, type_of_problem=tags, rating=rating)
         
         if not problem:
             await interaction.followup.send("Couldn't find a problem matching these criteria.", ephemeral=True)
@@ -316,19 +363,20 @@ class Challenges(commands.GroupCog, name = "challenge"):
                         await interaction.channel.send("Challenge canceled - all participants rejected.")
 
             async def _start_solve_tracking(self, channel, accepted_members):
-                handle_map = {str(m.id): await get_cf_handle(str(m.id)) for m in accepted_members}
+                handles = await get_cf_handles([str(m.id) for m in accepted_members])
+                handle_map = {str(m.id): handles.get(str(m.id)) for m in accepted_members}
                 parsed = _parse_contest_and_index_from_link(self.problem["link"])
                 if not parsed:
                     await channel.send("Error parsing problem link. Solve tracking unavailable.")
                     return
 
+                started_ts = int(time.time())
                 solve_view = self.cog_instance._SolveView(
                     challenge_id=self.challenge_id,
-                    participants=accepted_members,
                     handle_map=handle_map,
                     contest_id=parsed["contestId"],
                     index=parsed["index"],
-                    started_ts=int(time.time()),
+                    started_ts=started_ts,
                     bot=self.bot,
                     cog=self.cog_instance,
                     problem_name=self.problem['name'],
@@ -346,7 +394,19 @@ class Challenges(commands.GroupCog, name = "challenge"):
                 embed.add_field(name="Rating", value=str(self.problem.get('rating', 'N/A')), inline=True)
                 embed.add_field(name="Tags", value=", ".join(self.problem.get('tags', [])), inline=True)
                 
-                await channel.send(embed=embed, view=solve_view)
+                message = await channel.send(embed=embed, view=solve_view)
+                await create_challenge_session(
+                    challenge_id=self.challenge_id,
+                    channel_id=channel.id,
+                    message_id=message.id,
+                    cf_contest_id=parsed["contestId"],
+                    problem_index=parsed["index"],
+                    problem_name=self.problem['name'],
+                    problem_link=self.problem['link'],
+                    problem_rating=self.problem.get('rating'),
+                    started_ts=started_ts,
+                    handle_map=handle_map
+                )
         
         embed = discord.Embed(
             title=f"Codeforces Challenge: {problem['name']}",
@@ -413,6 +473,11 @@ class Challenges(commands.GroupCog, name = "challenge"):
             return
         
         embed = discord.Embed(title=title, color=discord.Color.blue())
+
+        # Older entries may lack a stored name; look those up in one batch
+        unnamed = list({entry['problem_link'] for entry in history_data if not entry['problem_name']})
+        resolved = dict(zip(unnamed, await get_problem_names(self.bot.cf_client, unnamed)))
+        problem_name = lambda entry: entry['problem_name'] or resolved.get(entry['problem_link']) or "Problem"
         
         if user:
             # For a specific user, the old format is fine as there are no duplicates.
@@ -423,7 +488,7 @@ class Challenges(commands.GroupCog, name = "challenge"):
                 rank_str = f"#{entry['rank']}" if entry['rank'] else "Surrendered"
                 points_str = f"{entry['points']} pts"
                 challenge_id_str = f"(ID: `{entry['challenge_id']}`)"
-                entries.append(f"{challenge_id_str} **[{entry['problem_name']}]({entry['problem_link']})** - {rank_str} ({points_str}) {time_str}")
+                entries.append(f"{challenge_id_str} **[{problem_name(entry)}]({entry['problem_link']})** - {rank_str} ({points_str}) {time_str}")
             embed.description = "\n".join(entries)
         else:
             # For general history, group by challenge ID to prevent duplicates
@@ -432,7 +497,7 @@ class Challenges(commands.GroupCog, name = "challenge"):
                 challenge_id = entry['challenge_id']
                 if challenge_id not in grouped_challenges:
                     grouped_challenges[challenge_id] = {
-                        'name': entry['problem_name'],
+                        'name': problem_name(entry),
                         'link': entry['problem_link'],
                         'timestamp': entry['timestamp'],
                         'participants': []
@@ -481,12 +546,26 @@ class Challenges(commands.GroupCog, name = "challenge"):
         await interaction.response.defer(ephemeral=False)
         limit = max(1, min(limit, 50))
         category_value = category.value if category else "overall"
-        leaderboard_data = await get_custom_leaderboard(category_value, limit)
+        # Names are resolved against the guild's members, so boards are cached per guild
+        cache_key = ("challenge", category_value, limit, interaction.guild.id)
+        cached = leaderboard_cache.get(cache_key, category_value)
+        if cached is None:
+            version = leaderboard_cache.version
+            leaderboard_data = await get_custom_leaderboard(category_value, limit)
+            embed = self._render_leaderboard(interaction.guild, category_value, leaderboard_data) if leaderboard_data else None
+            leaderboard_cache.put(cache_key, category_value, leaderboard_data, embed, version)
+        else:
+            leaderboard_data, embed = cached
         
         if not leaderboard_data:
             await interaction.followup.send("No users found in this leaderboard category.", ephemeral=False)
             return
         
+        embed.timestamp = discord.utils.utcnow()
+        embed.set_footer(text=f"Requested by {interaction.user.display_name}")
+        await interaction.followup.send(embed=embed)
+
+    def _render_leaderboard(self, guild: discord.Guild, category_value: str, leaderboard_data) -> discord.Embed:
         category_display = {
             "daily": "Daily Points", "weekly": "Weekly Points", "monthly": "Monthly Points",
             "overall": "Overall Points", "solved": "Problems Solved"
@@ -495,14 +574,12 @@ class Challenges(commands.GroupCog, name = "challenge"):
         embed = discord.Embed(title=f"🏆 Challenges Leaderboard ({category_display})", color=discord.Color.gold())
         entries = []
         for entry in leaderboard_data:
-            user = interaction.guild.get_member(int(entry["discord_id"]))
+            user = guild.get_member(int(entry["discord_id"]))
             name = user.mention if user else f"{entry['codeforces_name']}"
             entries.append(f"#{entry['rank']}: {name} - **{entry['score']}**")
         
         embed.description = "\n".join(entries)
-        embed.timestamp = discord.utils.utcnow()
-        embed.set_footer(text=f"Requested by {interaction.user.display_name}")
-        await interaction.followup.send(embed=embed)
+        return embed
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Challenges(bot))
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
+from utility.codeforces_client import CodeforcesAPIError, CodeforcesError, PRIORITY_INTERACTIVE
 from utility.db_helpers import get_user_by_discord, add_user, delete_user
 from utility.config_manager import get_auth_role_id
 
@@ -53,91 +53,81 @@ class Authentication(commands.Cog):
         
         handle = modal.handle
         
-        session = getattr(self.bot, "session", aiohttp.ClientSession())
-        should_close = not hasattr(self.bot, "session")
-
         try:
-            url = f"https://codeforces.com/api/user.info?handles={handle}"
-            async with session.get(url) as response:
-                if response.status != 200:
-                    await interaction.followup.send("Error: Couldn't connect to Codeforces API.", ephemeral=True)
-                    return
-                
-                data = await response.json()
-                if data["status"] != "OK":
-                    await interaction.followup.send(f"Error: Codeforces handle '{handle}' not found.", ephemeral=True)
-                    return
-                
-                user_data = data["result"][0]
-                
-            embed = discord.Embed(
-                title="Codeforces Authentication",
-                description=f"Please confirm you want to link your Discord account to the Codeforces handle: **{handle}**",
-                color=discord.Color.blue()
-            )
-            embed.add_field(name="Current Rating", value=str(user_data.get("rating", "N/A")), inline=True)
-            embed.add_field(name="Current Rank", value=str(user_data.get("rank", "N/A")).capitalize(), inline=True)
-            embed.add_field(name="Profile Link", value=f"[View on Codeforces](https://codeforces.com/profile/{handle})", inline=False)
-            
-            # MODIFIED: Corrected the thumbnail URL formatting
-            if "titlePhoto" in user_data:
-                photo_url = user_data["titlePhoto"]
-                if photo_url.startswith("//"):
-                    photo_url = f"https:{photo_url}"
-                
-                # Basic check to ensure it's a valid URL before setting
-                if photo_url.startswith("http"):
-                    embed.set_thumbnail(url=photo_url)
-
-            view = discord.ui.View(timeout=60)
-            confirm_button = discord.ui.Button(label="Confirm", style=discord.ButtonStyle.green)
-            cancel_button = discord.ui.Button(label="Cancel", style=discord.ButtonStyle.red)
-            
-            async def confirm_callback(confirm_interaction: discord.Interaction):
-                if confirm_interaction.user != interaction.user:
-                    await confirm_interaction.response.send_message("This is not your authentication process.", ephemeral=True)
-                    return
-                
-                await confirm_interaction.response.defer(ephemeral=True)
-                
-                await add_user(discord_id, handle)
-                
-                auth_role_id = await get_auth_role_id(interaction.guild.id)
-                auth_role = interaction.guild.get_role(auth_role_id) if auth_role_id else None
+            result = await self.bot.cf_client.call("user.info", {"handles": handle}, priority=PRIORITY_INTERACTIVE)
+        except CodeforcesAPIError:
+            await interaction.followup.send(f"Error: Codeforces handle '{handle}' not found.", ephemeral=True)
+            return
+        except CodeforcesError:
+            await interaction.followup.send("Error: Couldn't connect to Codeforces API.", ephemeral=True)
+            return
 
-                result_embed = discord.Embed(
-                    title="✅ Authentication Successful",
-                    description=f"Your Discord account has been linked to Codeforces handle: **{handle}**",
-                    color=discord.Color.green()
-                )
-                
-                if auth_role:
-                    await interaction.user.add_roles(auth_role, reason="Codeforces Authentication")
-                    result_embed.add_field(name="Auth Role", value=f"You have been given the {auth_role.mention} role.", inline=False)
-                else:
-                    result_embed.add_field(name="Auth Role", value="⚠️ Could not assign Auth role (not configured on this server).", inline=False)
+        user_data = result[0]
 
-                await confirm_interaction.followup.send(embed=result_embed, ephemeral=True)
-                await confirm_interaction.message.edit(content="Authentication completed! ✅", view=None, embed=None)
+        embed = discord.Embed(
+            title="Codeforces Authentication",
+            description=f"Please confirm you want to link your Discord account to the Codeforces handle: **{handle}**",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Current Rating", value=str(user_data.get("rating", "N/A")), inline=True)
+        embed.add_field(name="Current Rank", value=str(user_data.get("rank", "N/A")).capitalize(), inline=True)
+        embed.add_field(name="Profile Link", value=f"[View on Codeforces](https://codeforces.com/profile/{handle})", inline=False)
+        
+        # MODIFIED: Corrected the thumbnail URL formatting
+        if "titlePhoto" in user_data:
+            photo_url = user_data["titlePhoto"]
+            if photo_url.startswith("//"):
+                photo_url = f"https:{photo_url}"
+            
+            # Basic check to ensure it's a valid URL before setting
+            if photo_url.startswith("http"):
+                embed.set_thumbnail(url=photo_url)
 
+        view = discord.ui.View(timeout=60)
+        confirm_button = discord.ui.Button(label="Confirm", style=discord.ButtonStyle.green)
+        cancel_button = discord.ui.Button(label="Cancel", style=discord.ButtonStyle.red)
+        
+        async def confirm_callback(confirm_interaction: discord.Interaction):
+            if confirm_interaction.user != interaction.user:
+                await confirm_interaction.response.send_message("This is not your authentication process.", ephemeral=True)
+                return
             
-            async def cancel_callback(cancel_interaction: discord.Interaction):
-                if cancel_interaction.user != interaction.user:
-                    await cancel_interaction.response.send_message("This is not your authentication process.", ephemeral=True)
-                    return
-                await cancel_interaction.message.edit(content="Authentication cancelled. ❌", view=None, embed=None)
+            await confirm_interaction.response.defer(ephemeral=True)
             
-            confirm_button.callback = confirm_callback
-            cancel_button.callback = cancel_callback
+            await add_user(discord_id, handle)
             
-            view.add_item(confirm_button)
-            view.add_item(cancel_button)
+            auth_role_id = await get_auth_role_id(interaction.guild.id)
+            auth_role = interaction.guild.get_role(auth_role_id) if auth_role_id else None
+
+            result_embed = discord.Embed(
+                title="✅ Authentication Successful",
+                description=f"Your Discord account has been linked to Codeforces handle: **{handle}**",
+                color=discord.Color.green()
+            )
             
-            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            if auth_role:
+                await interaction.user.add_roles(auth_role, reason="Codeforces Authentication")
+                result_embed.add_field(name="Auth Role", value=f"You have been given the {auth_role.mention} role.", inline=False)
+            else:
+                result_embed.add_field(name="Auth Role", value="⚠️ Could not assign Auth role (not configured on this server).", inline=False)
+
+            await confirm_interaction.followup.send(embed=result_embed, ephemeral=True)
+            await confirm_interaction.message.edit(content="Authentication completed! ✅", view=None, embed=None)
+
+        
+        async def cancel_callback(cancel_interaction: discord.Interaction):
+            if cancel_interaction.user != interaction.user:
+                await cancel_interaction.response.send_message("This is not your authentication process.", ephemeral=True)
+                return
+            await cancel_interaction.message.edit(content="Authentication cancelled. ❌", view=None, embed=None)
+        
+        confirm_button.callback = confirm_callback
+        cancel_button.callback = cancel_callback
+        
+        view.add_item(confirm_button)
+        view.add_item(cancel_button)
         
-        finally:
-            if should_close and session:
-                await session.close()
+        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
     @app_commands.command(
         name="deauthenticate", 
@@ -22,7 +22,7 @@ class PickProblem(commands.Cog):
         # Default to random if no tags are provided
         type_of_problem = tags if tags else "random"
         
-        problem = await get_random_problem(self.bot.session, type_of_problem=type_of_problem, rating=rating, min_solved=min_solved)
+        problem = await get_random_problem(self.bot.cf_client, type_of_problem=type_of_problem, rating=rating, min_solved=min_solved)
         
         if not problem:
             # Provide more helpful error message
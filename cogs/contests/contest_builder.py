@@ -2,10 +2,9 @@ import re
 from typing import Dict, Optional
 import discord
 from discord.ext import commands
-import aiohttp
 from datetime import datetime, timedelta
-from utility.random_problems import get_random_problem
-from utility.db_helpers import get_contest_participant_count, update_contest_problems, create_bot_contest
+from utility.random_problems import get_random_problem, get_problem_by_key
+from utility.db_helpers import get_contest_participant_count, update_contest_problems, create_bot_contest, get_bot_contest, set_contest_announcement
 from utility.config_manager import get_cp_role_id, get_contest_channel_id
 
 
@@ -169,7 +168,7 @@ class AddProblemBuilderModal(discord.ui.Modal, title='Add Problem to Contest'):
             await interaction.followup.send("Contest session not found.", ephemeral=True)
             return
         
-        session = getattr(interaction.client, 'session', aiohttp.ClientSession())
+        client = interaction.client.cf_client
         
         if self.problem_link.value.strip():
             link = self.problem_link.value.strip()
@@ -177,7 +176,7 @@ class AddProblemBuilderModal(discord.ui.Modal, title='Add Problem to Contest'):
                 await interaction.followup.send("Invalid Codeforces problem link format.", ephemeral=True)
                 return
             
-            problem_name = await self._get_problem_name(session, link)
+            problem_name = await self._get_problem_name(client, link)
             display_name = problem_name if problem_name else self._extract_problem_code(link)
             
             problem_data = {'link': link, 'display_name': display_name, 'criteria': 'Direct Link'}
@@ -186,7 +185,7 @@ class AddProblemBuilderModal(discord.ui.Modal, title='Add Problem to Contest'):
             rating_val = self.rating.value.strip() or "random"
             min_solved_val = int(self.min_solved.value.strip()) if self.min_solved.value.strip().isdigit() else None
             
-            problem_data_api = await get_random_problem(session, tags_val, rating_val, min_solved_val)
+            problem_data_api = await get_random_problem(client, tags_val, rating_val, min_solved_val)
             if not problem_data_api or not problem_data_api.get("link"):
                 await interaction.followup.send("Could not find a problem matching your criteria.", ephemeral=True)
                 return
@@ -221,18 +220,14 @@ class AddProblemBuilderModal(discord.ui.Modal, title='Add Problem to Contest'):
         match = re.search(r'/(\d+)/problem/([A-Z]\d*)', link)
         return f"{match.group(1)}{match.group(2)}" if match else "Unknown Problem"
     
-    async def _get_problem_name(self, session, link: str) -> Optional[str]:
+    async def _get_problem_name(self, client, link: str) -> Optional[str]:
         try:
             match = self._extract_problem_code(link)
             contest_id, problem_index = re.match(r'(\d+)([A-Z]\d*)', match).groups()
             
-            async with session.get("https://codeforces.com/api/problemset.problems") as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    if data.get('status') == 'OK':
-                        for problem in data['result']['problems']:
-                            if str(problem['contestId']) == contest_id and problem['index'] == problem_index:
-                                return f"{contest_id}{problem_index} - {problem['name']}"
+            problem = await get_problem_by_key(client, int(contest_id), problem_index)
+            if problem:
+                return f"{contest_id}{problem_index} - {problem['name']}"
         except Exception:
             pass
         return None
@@ -291,7 +286,11 @@ class ContestBuilderView(discord.ui.View):
             
             problem_links = [p['link'] for p in contest_data['problems']]
             await update_contest_problems(new_id, problem_links)
-            
+
+            contest_cog = interaction.client.get_cog('contest')
+            if contest_cog:
+                contest_cog.scheduler.schedule(await get_bot_contest(new_id))
+
             embed = create_contest_completed_embed(contest_data, new_id)
             
             for item in self.children:
@@ -321,32 +320,14 @@ class ContestBuilderView(discord.ui.View):
             participant_role = interaction.guild.get_role(participant_role_id) if participant_role_id else None
             participant_count = await get_contest_participant_count(contest_id)
             
-            if contest_data.get('unix_timestamp'):
-                starts_at_text = f"<t:{contest_data['unix_timestamp']}:F> (<t:{contest_data['unix_timestamp']}:R>)"
-            else:
-                starts_at_text = datetime.fromisoformat(contest_data['start_time']).strftime('%d/%m/%Y %H:%M')
+            embed = create_contest_announcement_embed(contest_data, contest_id, len(contest_data.get('problems', [])), participant_count)
             
-            embed = discord.Embed(
-                title=f"📢 New Contest: {contest_data['name']}",
-                description=(
-                    f"A new contest has been scheduled!\n\n"
-                    f"**Starts at:** {starts_at_text}\n"
-                    f"**Duration:** {contest_data['duration']} minutes\n"
-                    f"**Problems:** {len(contest_data.get('problems', []))}\n"
-                    f"**Participants:** {participant_count}"
-                ),
-                color=discord.Color.blue()
-            )
-            embed.set_footer(text=f"Contest ID: {contest_id}")
-            
-            view = discord.ui.View(timeout=None)
-            view.add_item(discord.ui.Button(label="Join Contest", style=discord.ButtonStyle.success, custom_id=f"join_{contest_id}"))
-            
-            await contest_channel.send(
+            message = await contest_channel.send(
                 content=f"{participant_role.mention if participant_role else 'Participants'}", 
                 embed=embed, 
-                view=view
+                view=create_join_contest_view(contest_id)
             )
+            await set_contest_announcement(contest_id, contest_channel.id, message.id)
         except Exception as e:
             print(f"Error sending announcement: {e}")
 
@@ -406,6 +387,31 @@ def create_contest_setup_embed(contest_data: Dict) -> discord.Embed:
     embed.add_field(name=f"Problems ({len(problems)})", value=problems_text, inline=False)
     return embed
 
+def create_contest_announcement_embed(contest_data: Dict, contest_id: int, problems_count: int, participant_count: int) -> discord.Embed:
+    if contest_data.get('unix_timestamp'):
+        starts_at_text = f"<t:{contest_data['unix_timestamp']}:F> (<t:{contest_data['unix_timestamp']}:R>)"
+    else:
+        starts_at_text = datetime.fromisoformat(contest_data['start_time']).strftime('%d/%m/%Y %H:%M')
+    
+    embed = discord.Embed(
+        title=f"📢 New Contest: {contest_data['name']}",
+        description=(
+            f"A new contest has been scheduled!\n\n"
+            f"**Starts at:** {starts_at_text}\n"
+            f"**Duration:** {contest_data['duration']} minutes\n"
+            f"**Problems:** {problems_count}\n"
+            f"**Participants:** {participant_count}"
+        ),
+        color=discord.Color.blue()
+    )
+    embed.set_footer(text=f"Contest ID: {contest_id}")
+    return embed
+
+def create_join_contest_view(contest_id: int) -> discord.ui.View:
+    view = discord.ui.View(timeout=None)
+    view.add_item(discord.ui.Button(label="Join Contest", style=discord.ButtonStyle.success, custom_id=f"join_{contest_id}"))
+    return view
+
 def create_contest_completed_embed(contest_data: Dict, contest_id: int) -> discord.Embed:
     embed = discord.Embed(title="✅ Contest Created Successfully!", color=discord.Color.green())
     embed.add_field(name="Contest ID", value=str(contest_id), inline=True)
@@ -1,27 +1,181 @@
+import asyncio
 import discord
-import json
 import aiohttp
-import re
-from typing import Optional
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 from discord.ext import commands
 from discord import app_commands
 from discord.ext import tasks
 from datetime import datetime, timedelta
 
-from .contest_builder import ContestBuilderView, contest_builder, create_contest_setup_embed
+from .contest_builder import (
+    ContestBuilderView, contest_builder, create_contest_setup_embed,
+    create_contest_announcement_embed, create_join_contest_view
+)
 # MODIFIED: Corrected imports to use getter functions
 from utility.config_manager import get_cp_role_id, get_contest_channel_id, get_mentor_role_id
+from utility.submission_store import submission_store
+from utility.leaderboard_cache import leaderboard_cache
+from utility.announcement_updater import AnnouncementUpdater
+from utility.broadcaster import Broadcaster
+from utility.standings import ContestStandings
+from utility.random_problems import get_problem_names
+from utility.contest_scheduler import ContestScheduler, contest_deadlines, START, END
+from utility.codeforces_client import CodeforcesError, PRIORITY_BACKGROUND
 from utility.db_helpers import (
     get_bot_contest, 
     get_pending_and_active_contests, update_contest_status,
     get_contest_problems, get_contest_leaderboard, get_all_bot_contests,
     get_contest_custom_leaderboard,
-    get_contest_solves_info, update_contest_solves_info,
+    get_contest_problem_rows, get_contest_solved_positions, record_contest_solve,
     get_user_by_discord, join_contest, get_contest_participant,
-    update_contest_participant_score, get_contest_participant_count,
-    increment_user_problems_solved
+    get_contest_participant_count,
+    increment_user_problems_solved, set_contest_announcement,
+    create_broadcast, get_contest_solves, set_contest_scoreboard
 )
 
+# --- Solve Awarding ---
+
+# How often the background poller pulls recent submissions for active contests
+SUBMISSION_POLL_SECONDS = 30
+# Size of the newest-submissions page fetched per Codeforces contest on each poll
+SUBMISSION_POLL_PAGE_SIZE = 500
+
+FIRST_SOLVE_BONUS = 3
+
+# Minimum time between two edits of a contest's live scoreboard
+SCOREBOARD_REFRESH_SECONDS = 15
+# Participants listed on the scoreboard
+SCOREBOARD_ROWS = 25
+
+# How long a contest deadline that can't be handled yet (no problems, guild
+# unavailable) waits before it is tried again
+START_RETRY_SECONDS = 60
+
+
+# Verdicts that don't count as a wrong attempt (ICPC ignores compilation errors)
+UNPENALIZED_VERDICTS = {'OK', 'COMPILATION_ERROR', 'TESTING', None}
+
+
+def is_penalized_attempt(submission: dict, since_ts: Optional[int]) -> bool:
+    """Whether a submission counts as a rejected attempt made during the contest."""
+    if submission.get('verdict') in UNPENALIZED_VERDICTS:
+        return False
+    return not since_ts or submission.get('creationTimeSeconds', 0) >= since_ts
+
+
+def find_contest_solve(submissions: List[dict], problem_index: str, started_at: Optional[int]) -> Tuple[Optional[dict], int]:
+    """
+    From a handle's submissions (newest first), pick the first accepted one to
+    the problem made during the contest and count the rejected attempts before
+    it. Submissions from before the start are ignored.
+    """
+    wrong_attempts = 0
+    for submission in reversed(submissions):
+        if submission['problem']['index'] != problem_index:
+            continue
+        if started_at and submission.get('creationTimeSeconds', 0) < started_at:
+            continue
+        if submission.get('verdict') == 'OK':
+            return submission, wrong_attempts
+        if is_penalized_attempt(submission, started_at):
+            wrong_attempts += 1
+    return None, wrong_attempts
+
+
+async def award_contest_solve(bot, guild: discord.Guild, contest_id: int, discord_id: str, problem_index: int, problem_link: str, submission: dict, wrong_attempts: int = 0) -> Optional[Dict]:
+    """
+    Award points (and the first-solve bonus) for an accepted submission.
+    `wrong_attempts` is the number of rejected submissions before it.
+    Returns the award details, or None if the participant isn't registered
+    or was already awarded this problem.
+    """
+    rating = submission['problem'].get('rating', 0)
+    points = rating // 100
+
+    if points == 0:
+        points = 10 # Fallback for unrated problems
+
+    award = await record_contest_solve(
+        contest_id, problem_index, discord_id, points,
+        first_solve_bonus=FIRST_SOLVE_BONUS,
+        solved_at=submission.get('creationTimeSeconds'),
+        wrong_attempts=wrong_attempts
+    )
+    if not award:
+        return None
+    await increment_user_problems_solved(
+        discord_id, submission['problem'].get('contestId'), submission['problem'].get('index'),
+        submission.get('creationTimeSeconds')
+    )
+
+    if award['is_first_solve'] and guild:
+        contest_channel_id = await get_contest_channel_id(guild.id)
+        announce_channel = bot.get_channel(contest_channel_id) if contest_channel_id else None
+        if announce_channel:
+            await announce_channel.send(f"🎈 First accepted on [Problem {problem_index + 1}]({problem_link}) by <@{discord_id}>!")
+
+    contest_cog = bot.get_cog('contest')
+    if contest_cog:
+        contest_cog.on_contest_solve(
+            contest_id, discord_id, problem_index, award['points'],
+            submission.get('creationTimeSeconds'), award['is_first_solve'], wrong_attempts
+        )
+
+    return {"points": award['points'], "rating": rating, "is_first_solve": award['is_first_solve']}
+
+def create_scoreboard_embed(standings: ContestStandings, final: bool = False) -> discord.Embed:
+    """Live (or final) scoreboard of a running contest."""
+    letters = [chr(ord('A') + i) if i < 26 else str(i + 1) for i in range(standings.problem_count)]
+    embed = discord.Embed(
+        title=f"📊 {'Final' if final else 'Live'} Scoreboard: {standings.name}",
+        color=discord.Color.gold() if final else discord.Color.green()
+    )
+
+    lines = []
+    for rank, row in standings.top(SCOREBOARD_ROWS):
+        solved = " ".join(
+            f"{letters[p]}{'🎈' if p in row.first else ''}{f'(+{row.attempts[p]})' if row.attempts.get(p) else ''}"
+            for p in sorted(row.solved)
+        ) or "—"
+        lines.append(f"`#{rank}` <@{row.discord_id}> ({row.handle}) — **{len(row.solved)}** solved, {row.penalty} min · {solved}")
+    if len(standings) > SCOREBOARD_ROWS:
+        lines.append(f"...and {len(standings) - SCOREBOARD_ROWS} more")
+    embed.description = "\n".join(lines) if lines else "No participants yet."
+
+    problem_lines = []
+    for p in range(standings.problem_count):
+        first = standings.first_solvers.get(p)
+        problem_lines.append(
+            f"**{letters[p]}**: {standings.solve_counts[p]} solved" + (f" (first: <@{first}>)" if first else "")
+        )
+    if problem_lines:
+        embed.add_field(name="Problems", value="\n".join(problem_lines)[:1024], inline=False)
+
+    embed.set_footer(text=f"Contest ID: {standings.contest_id}" + ("" if final else f" • Updates every {SCOREBOARD_REFRESH_SECONDS}s"))
+    embed.timestamp = discord.utils.utcnow()
+    return embed
+
+def create_broadcast_embed(broadcast_id: int, progress: Dict, done: bool) -> discord.Embed:
+    """Progress (or final summary) of a /contest notify DM broadcast."""
+    embed = discord.Embed(
+        title="✅ Notification Sent" if done else "📨 Sending Notification...",
+        description=(
+            f"**Delivered:** {progress['sent']}/{progress['total']}\n"
+            f"**Failed:** {progress['failed']}"
+            + ("" if done else f"\n**Remaining:** {progress['pending']}")
+        ),
+        color=discord.Color.green() if done else discord.Color.blue()
+    )
+    failures = progress.get('failures') or []
+    if failures:
+        lines = [f"<@{f['discord_id']}>: {f['error']}" for f in failures[:20]]
+        if len(failures) > 20:
+            lines.append(f"...and {len(failures) - 20} more")
+        embed.add_field(name="Failed Deliveries", value="\n".join(lines), inline=False)
+    embed.set_footer(text=f"Broadcast ID: {broadcast_id}")
+    return embed
+
 # --- Interaction Handler Class ---
 
 class ContestInteractionHandler:
@@ -77,11 +231,11 @@ class ContestInteractionHandler:
                 return
 
         if not was_already_joined:
-            try:
-                participant_count = await get_contest_participant_count(contest_id)
-                await self._update_announcement_with_participant_count(interaction, contest_data, contest_id, participant_count)
-            except Exception as e:
-                print(f"Error updating announcement with participant count: {e}")
+            contest_cog = self.bot.get_cog('contest')
+            if contest_cog:
+                contest_cog.announcements.mark_dirty(contest_id)
+                if contest_data['status'] == 'ACTIVE':
+                    contest_cog.on_contest_join(contest_id, str(interaction.user.id), user_data['cf_handle'])
 
     async def handle_check_solved(self, interaction: discord.Interaction, custom_id: str):
         """Handle check solved button clicks with robust API checking and dynamic scoring"""
@@ -111,98 +265,112 @@ class ContestInteractionHandler:
             )
             return
 
-        problems = await get_contest_problems(contest_id)
+        problems = await get_contest_problem_rows(contest_id)
         if problem_index >= len(problems):
             await interaction.followup.send("Invalid problem index.", ephemeral=True)
             return
 
-        problem_link = problems[problem_index]
-        
-        match = re.search(r'/(?:contest|problemset/problem|gym)/(\d+)/problem/([A-Z0-9]+)', problem_link)
-        if not match:
+        problem = problems[problem_index]
+        problem_link = problem['link']
+        if problem['cf_contest_id'] is None:
             await interaction.followup.send("Invalid problem link format. Could not parse contest ID.", ephemeral=True)
             return
-        cf_contest_id, problem_letter = match.groups()
+        cf_contest_id, problem_letter = problem['cf_contest_id'], problem['problem_index']
 
         try:
-            api_url = f"https://codeforces.com/api/contest.status?contestId={cf_contest_id}&handle={participant['codeforces_handle']}"
-            
-            async with self.bot.session.get(api_url) as resp:
-                if resp.status != 200:
-                    await interaction.followup.send("Error checking Codeforces API. Please try again later.", ephemeral=True)
-                    return
-                
-                data = await resp.json()
-                if data.get('status') != 'OK':
-                    await interaction.followup.send(f"Codeforces API error: {data.get('comment', 'Unknown error')}", ephemeral=True)
-                    return
-
-                solved = False
-                accepted_submission = None
-                for submission in data.get('result', []):
-                    if (submission['problem']['index'] == problem_letter and 
-                        submission['verdict'] == 'OK'):
-                        solved = True
-                        accepted_submission = submission
-                        break
-
-                if solved:
-                    solved_problems = json.loads(participant.get('solved_problems', '[]'))
-                    if problem_index not in solved_problems:
-                        solved_problems.append(problem_index)
-                        
-                        rating = accepted_submission['problem'].get('rating', 0)
-                        points = rating // 100
-                        
-                        if points == 0:
-                            points = 10 # Fallback for unrated problems
-
-                        solves_info = await get_contest_solves_info(contest_id)
-                        problem_key = str(problem_index)
-                        is_first_solve = problem_key not in solves_info
-                        
-                        if is_first_solve:
-                            points += 3 # Add 3 bonus points
-                            solves_info[problem_key] = str(interaction.user.id)
-                            await update_contest_solves_info(contest_id, solves_info)
-                        
-                        feedback_message = f"🎉 Congratulations! You solved problem {problem_index + 1}"
-                        if rating > 0:
-                            feedback_message += f" (Rating: {rating})"
-                        feedback_message += f" and earned {points} points"
-                        if is_first_solve:
-                            feedback_message += " (including a 3 point First Accepted bonus)!"
-                        else:
-                            feedback_message += "!"
-
-                        await update_contest_participant_score(
-                            contest_id, str(interaction.user.id), points, solved_problems
-                        )
-                        await increment_user_problems_solved(str(interaction.user.id))
-                        await interaction.followup.send(feedback_message, ephemeral=True)
+            submissions = await submission_store.get_submissions(self.bot.cf_client, participant['codeforces_handle'], int(cf_contest_id), problem_letter)
+            if submissions is None:
+                await interaction.followup.send("Error checking Codeforces API. Please try again later.", ephemeral=True)
+                return
 
-                        if is_first_solve:
-                            contest_channel_id = await get_contest_channel_id(interaction.guild.id)
-                            announce_channel = self.bot.get_channel(contest_channel_id) if contest_channel_id else None
-                            if announce_channel:
-                                await announce_channel.send(f"🎈 First accepted on [Problem {problem_index + 1}]({problem_link}) by {interaction.user.mention}!")
+            accepted_submission, wrong_attempts = find_contest_solve(submissions, problem_letter, contest_data.get('started_at'))
 
+            if accepted_submission:
+                award = await award_contest_solve(
+                    self.bot, interaction.guild, contest_id, str(interaction.user.id),
+                    problem_index, problem_link, accepted_submission, wrong_attempts
+                )
+                if award:
+                    feedback_message = f"🎉 Congratulations! You solved problem {problem_index + 1}"
+                    if award['rating'] > 0:
+                        feedback_message += f" (Rating: {award['rating']})"
+                    feedback_message += f" and earned {award['points']} points"
+                    if award['is_first_solve']:
+                        feedback_message += " (including a 3 point First Accepted bonus)!"
                     else:
-                        await interaction.followup.send(
-                            f"You've already been awarded points for problem {problem_index + 1}.", 
-                            ephemeral=True
-                        )
+                        feedback_message += "!"
+                    await interaction.followup.send(feedback_message, ephemeral=True)
                 else:
                     await interaction.followup.send(
-                        f"I couldn't find an 'Accepted' submission for this problem. Keep trying! 💪", 
+                        f"You've already been awarded points for problem {problem_index + 1}.", 
                         ephemeral=True
                     )
+            else:
+                await interaction.followup.send(
+                    f"I couldn't find an 'Accepted' submission for this problem. Keep trying! 💪", 
+                    ephemeral=True
+                )
         except Exception as e:
             await interaction.followup.send(f"An error occurred while checking your solution: {str(e)}", ephemeral=True)
 
-    async def _update_announcement_with_participant_count(self, interaction: discord.Interaction, contest_data: dict, contest_id: int, participant_count: int):
-        """Update the original announcement message with participant count"""
-        contest_channel_id = await get_contest_channel_id(interaction.guild.id)
+# --- Main Slash Command Cog ---
+
+class ContestCommands(commands.GroupCog, name = "contest"):
+    def __init__(self, bot):
+        self.bot = bot
+        self.active_contests = {}
+        self.scheduler = ContestScheduler(self._on_contest_deadline)
+        self._scheduler_task = None
+        self.announcements = AnnouncementUpdater(self._render_announcement)
+        self.broadcaster = Broadcaster(bot)
+        # Live scoreboards of running contests, loaded lazily and then updated in memory
+        self.standings: Dict[int, ContestStandings] = {}
+        self._standings_loads: Dict[int, asyncio.Task] = {}
+        # Joins and solves that arrive while a contest's standings are being loaded
+        self._standings_backlog: Dict[int, List[Callable[[ContestStandings], None]]] = {}
+        self._scoreboard_messages: Dict[int, tuple] = {}
+        self.scoreboards = AnnouncementUpdater(self._render_scoreboard, interval=SCOREBOARD_REFRESH_SECONDS)
+        self.submission_poller.start()
+
+    async def cog_load(self):
+        self._scheduler_task = asyncio.create_task(self._run_scheduler())
+
+    async def cog_unload(self):
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
+        self.submission_poller.cancel()
+        self.announcements.close()
+        self.scoreboards.close()
+        await self.broadcaster.close()
+
+    async def _render_announcement(self, contest_id: int):
+        """Update the original announcement message with the current participant count"""
+        contest_data = await get_bot_contest(contest_id)
+        if not contest_data:
+            return
+        participant_count = await get_contest_participant_count(contest_id)
+        problems_list = await get_contest_problems(contest_id)
+        problems_count = len(problems_list) if problems_list else 0
+        embed = create_contest_announcement_embed(contest_data, contest_id, problems_count, participant_count)
+        view = create_join_contest_view(contest_id)
+
+        channel_id = contest_data.get('announcement_channel_id')
+        message_id = contest_data.get('announcement_message_id')
+        if channel_id and message_id:
+            # Edit the stored message directly; no fetch or history scan needed
+            message = self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+            try:
+                await message.edit(embed=embed, view=view)
+            except discord.NotFound:
+                print(f"Announcement message for contest {contest_id} no longer exists")
+            except Exception as e:
+                print(f"Error updating announcement message: {e}")
+            return
+
+        # Contests announced before the message ID was stored: find it once and remember it
+        if not contest_data.get('guild_id'):
+            return
+        contest_channel_id = await get_contest_channel_id(contest_data['guild_id'])
         contest_channel = self.bot.get_channel(contest_channel_id) if contest_channel_id else None
         if not contest_channel:
             return
@@ -212,80 +380,212 @@ class ContestInteractionHandler:
                     message.embeds and 
                     message.embeds[0].footer and 
                     f"Contest ID: {contest_id}" in message.embeds[0].footer.text):
-                    
-                    if contest_data.get('unix_timestamp'):
-                        starts_at_text = f"<t:{contest_data['unix_timestamp']}:F> (<t:{contest_data['unix_timestamp']}:R>)"
-                    else:
-                        starts_at_text = datetime.fromisoformat(contest_data['start_time']).strftime('%d/%m/%Y %H:%M')
-                    
-                    problems_list = await get_contest_problems(contest_id)
-                    problems_count = len(problems_list) if problems_list else 0
-                    
-                    embed = discord.Embed(
-                        title=f"📢 New Contest: {contest_data['name']}",
-                        description=(
-                            f"A new contest has been scheduled!\n\n"
-                            f"**Starts at:** {starts_at_text}\n"
-                            f"**Duration:** {contest_data['duration']} minutes\n"
-                            f"**Problems:** {problems_count}\n"
-                            f"**Participants:** {participant_count}"
-                        ),
-                        color=discord.Color.blue()
-                    )
-                    embed.set_footer(text=f"Contest ID: {contest_id}")
-                    
-                    view = discord.ui.View(timeout=None)
-                    view.add_item(discord.ui.Button(label="Join Contest", style=discord.ButtonStyle.success, custom_id=f"join_{contest_id}"))
-                    
                     await message.edit(embed=embed, view=view)
+                    await set_contest_announcement(contest_id, contest_channel.id, message.id)
                     break
         except Exception as e:
             print(f"Error updating announcement message: {e}")
 
-# --- Main Slash Command Cog ---
+    def on_contest_join(self, contest_id: int, discord_id: str, handle: str):
+        """Add a participant who joined a running contest to its scoreboard."""
+        self._update_standings(contest_id, lambda standings: standings.add_participant(discord_id, handle))
+        self.scoreboards.mark_dirty(contest_id)
+
+    def on_contest_solve(self, contest_id: int, discord_id: str, position: int, points: int, solved_at: Optional[int], is_first: bool, wrong_attempts: int = 0):
+        """Apply an awarded solve to the in-memory standings and schedule a scoreboard refresh."""
+        self._update_standings(
+            contest_id,
+            lambda standings: standings.record_solve(discord_id, position, points, solved_at, is_first, wrong_attempts)
+        )
+        self.scoreboards.mark_dirty(contest_id)
+
+    def _update_standings(self, contest_id: int, update: Callable[[ContestStandings], None]):
+        standings = self.standings.get(contest_id)
+        if standings is not None:
+            update(standings)
+        elif contest_id in self._standings_loads:
+            # The load may have read the database before this write; replay it once the load is done
+            self._standings_backlog.setdefault(contest_id, []).append(update)
+
+    async def _get_standings(self, contest_id: int) -> Optional[ContestStandings]:
+        standings = self.standings.get(contest_id)
+        if standings is not None:
+            return standings
+        # First use since start or restart: build from the database once, shared by concurrent callers
+        task = self._standings_loads.get(contest_id)
+        if task is None:
+            task = asyncio.create_task(self._load_standings(contest_id))
+            self._standings_loads[contest_id] = task
+            task.add_done_callback(lambda _: self._standings_loads.pop(contest_id, None))
+        return await asyncio.shield(task)
+
+    async def _load_standings(self, contest_id: int) -> Optional[ContestStandings]:
+        try:
+            contest_data = await get_bot_contest(contest_id)
+            if not contest_data or contest_data['status'] != 'ACTIVE':
+                return None
+            problems = await get_contest_problems(contest_id)
+            standings = ContestStandings.from_rows(
+                contest_data, len(problems), await get_contest_leaderboard(contest_id), await get_contest_solves(contest_id)
+            )
+        finally:
+            backlog = self._standings_backlog.pop(contest_id, [])
+        # Joins and solves are idempotent, so replaying one the load already saw is harmless
+        for update in backlog:
+            update(standings)
+        self.standings[contest_id] = standings
+        if contest_data.get('scoreboard_message_id'):
+            self._scoreboard_messages[contest_id] = (contest_data['scoreboard_channel_id'], contest_data['scoreboard_message_id'])
+        return standings
+
+    async def _render_scoreboard(self, contest_id: int, final: bool = False):
+        standings = await self._get_standings(contest_id)
+        location = self._scoreboard_messages.get(contest_id)
+        if standings is None or not location:
+            return
+        message = self.bot.get_partial_messageable(location[0]).get_partial_message(location[1])
+        try:
+            await message.edit(embed=create_scoreboard_embed(standings, final))
+            if final:
+                await message.unpin()
+        except discord.NotFound:
+            print(f"Scoreboard message for contest {contest_id} no longer exists")
+        except discord.HTTPException as e:
+            print(f"Error updating scoreboard for contest {contest_id}: {e}")
+
+    async def _post_scoreboard(self, channel: discord.abc.Messageable, contest_id: int):
+        """Post and pin the live scoreboard of a contest that just started."""
+        self.standings.pop(contest_id, None)
+        standings = await self._get_standings(contest_id)
+        if standings is None:
+            return
+        message = await channel.send(embed=create_scoreboard_embed(standings))
+        try:
+            await message.pin()
+        except discord.HTTPException as e:
+            print(f"Could not pin scoreboard for contest {contest_id}: {e}")
+        self._scoreboard_messages[contest_id] = (channel.id, message.id)
+        await set_contest_scoreboard(contest_id, channel.id, message.id)
+
+    async def _run_scheduler(self):
+        await self.bot.wait_until_ready()
+        await self.broadcaster.resume()
+        await self.scheduler.run()
+
+    async def _on_contest_deadline(self, kind: str, contest_id: int):
+        """Start or end a contest when the scheduler says its deadline has arrived."""
+        contest_data = await get_bot_contest(contest_id)
+        if not contest_data:
+            return
 
-class ContestCommands(commands.GroupCog, name = "contest"):
-    def __init__(self, bot):
-        self.bot = bot
-        self.active_contests = {}
-        self.contest_loop.start()
+        guild_id = contest_data.get('guild_id')
+        guild = self.bot.get_guild(guild_id) if guild_id else None
+        if not guild:
+            pending_start = kind == START and contest_data['status'] == 'PENDING' and time.time() < contest_deadlines(contest_data)[1]
+            pending_end = kind == END and contest_data['status'] == 'ACTIVE'
+            if guild_id and (pending_start or pending_end):
+                # The guild may only be unavailable for now (e.g. a Discord outage); try again later
+                print(f"Guild {guild_id} of contest {contest_id} was not found, retrying in {START_RETRY_SECONDS}s.")
+                self.scheduler.retry(kind, contest_id, START_RETRY_SECONDS)
+            return
 
-    def cog_unload(self):
-        self.contest_loop.cancel()
+        if kind == START and contest_data['status'] == 'PENDING':
+            _, end_ts = contest_deadlines(contest_data)
+            if time.time() >= end_ts:
+                return
+            problems = await get_contest_problems(contest_id)
+            if not problems:
+                # Problems may still be added; keep trying until the contest window closes
+                print(f"Contest {contest_id} has no problems yet, retrying its start in {START_RETRY_SECONDS}s.")
+                self.scheduler.retry(START, contest_id, START_RETRY_SECONDS)
+                return
+            await self.start_contest(guild, contest_id, contest_data['name'], problems, contest_data['duration'])
+
+        elif kind == END and contest_data['status'] == 'ACTIVE':
+            await self.end_contest(guild, contest_id, contest_data['name'])
 
-    @tasks.loop(minutes=1)
-    async def contest_loop(self):
+    @tasks.loop(seconds=SUBMISSION_POLL_SECONDS)
+    async def submission_poller(self):
+        """Award solves for every active contest, spotting new accepts with one batched status fetch per CF contest."""
         contests = await get_pending_and_active_contests()
         for contest_data in contests:
+            if contest_data['status'] != 'ACTIVE':
+                continue
             try:
-                guild_id = contest_data.get('guild_id')
-                if not guild_id:
-                    print(f"Skipping contest {contest_data['contest_id']} because it has no guild_id.")
-                    continue
-                
-                guild = self.bot.get_guild(guild_id)
-                if not guild:
-                    print(f"Skipping contest {contest_data['contest_id']} because guild {guild_id} was not found.")
-                    continue
+                await self._poll_contest_submissions(contest_data)
+            except Exception as e:
+                print(f"Error polling submissions for contest {contest_data['contest_id']}: {e}")
 
-                start_time = datetime.fromisoformat(contest_data['start_time'])
-                end_time = start_time + timedelta(minutes=contest_data['duration'])
-                now = datetime.now()
+    @submission_poller.before_loop
+    async def before_submission_poller(self):
+        await self.bot.wait_until_ready()
 
-                if contest_data['status'] == 'PENDING' and start_time <= now < end_time:
-                    problems = await get_contest_problems(contest_data['contest_id'])
-                    if not problems:
-                        continue
-                    await self.start_contest(guild, contest_data['contest_id'], contest_data['name'], problems, contest_data['duration'])
+    async def _poll_contest_submissions(self, contest_data: dict):
+        contest_id = contest_data['contest_id']
+        guild = self.bot.get_guild(contest_data['guild_id']) if contest_data.get('guild_id') else None
 
-                elif contest_data['status'] == 'ACTIVE' and now >= end_time:
-                    await self.end_contest(guild, contest_data['contest_id'], contest_data['name'])
-            except Exception as e:
-                print(f"Error processing contest {contest_data['contest_id']}: {e}")
+        participants = await get_contest_leaderboard(contest_id)
+        if not participants:
+            return
+        by_handle = {p['codeforces_handle'].lower(): p for p in participants}
+        solved = await get_contest_solved_positions(contest_id)
+
+        # Group the contest's problems by the Codeforces contest they come from
+        problems_by_cf_contest: Dict[int, List[tuple]] = {}
+        for problem in await get_contest_problem_rows(contest_id):
+            if problem['cf_contest_id'] is not None:
+                problems_by_cf_contest.setdefault(problem['cf_contest_id'], []).append(
+                    (problem['position'], problem['problem_index'], problem['link'])
+                )
+
+        for cf_contest_id, problems in problems_by_cf_contest.items():
+            try:
+                submissions = await self.bot.cf_client.call(
+                    "contest.status",
+                    {"contestId": cf_contest_id, "from": 1, "count": SUBMISSION_POLL_PAGE_SIZE},
+                    priority=PRIORITY_BACKGROUND,
+                )
+            except CodeforcesError as e:
+                print(f"Error polling Codeforces contest {cf_contest_id}: {e}")
                 continue
-    
+
+            # The page only spots new accepts, oldest first so the earliest one claims the
+            # first-solve bonus. The solve itself and its rejected attempts come from the
+            # participant's stored history, exactly as for a manual check, since the page
+            # may not reach back to every earlier attempt.
+            started_at = contest_data.get('started_at')
+            for submission in reversed(submissions):
+                if submission.get('verdict') != 'OK':
+                    continue
+                if started_at and submission.get('creationTimeSeconds', 0) < started_at:
+                    continue
+                for member in submission.get('author', {}).get('members', []):
+                    participant = by_handle.get(member.get('handle', '').lower())
+                    if not participant:
+                        continue
+                    solved_positions = solved.setdefault(participant['discord_id'], set())
+                    for position, letter, link in problems:
+                        if submission['problem']['index'] != letter or position in solved_positions:
+                            continue
+                        history = await submission_store.get_submissions(
+                            self.bot.cf_client, participant['codeforces_handle'], cf_contest_id, letter,
+                            priority=PRIORITY_BACKGROUND
+                        )
+                        if history is None:
+                            continue
+                        accepted_submission, wrong_attempts = find_contest_solve(history, letter, started_at)
+                        if accepted_submission is None:
+                            continue
+                        solved_positions.add(position)
+                        await award_contest_solve(
+                            self.bot, guild, contest_id, participant['discord_id'], position, link,
+                            accepted_submission, wrong_attempts
+                        )
+
     async def start_contest(self, guild: discord.Guild, contest_id: int, contest_name: str, problems: list, duration: int):
-        await update_contest_status(contest_id, 'ACTIVE')
+        await update_contest_status(contest_id, 'ACTIVE', started_at=int(time.time()))
+        # Show the final pre-start participant count without waiting for the next interval
+        await self.announcements.flush(contest_id)
         
         contest_channel_id = await get_contest_channel_id(guild.id)
         channel = self.bot.get_channel(contest_channel_id) if contest_channel_id else None
@@ -298,18 +598,28 @@ class ContestCommands(commands.GroupCog, name = "contest"):
         embed.add_field(name="⏳ Ends", value=f"<t:{end_timestamp}:R> (Total: {duration} mins)", inline=False)
         
         view = discord.ui.View(timeout=None)
-        for i, problem_link in enumerate(problems):
-            embed.add_field(name=f"Problem {i+1}", value=f"[Link]({problem_link})", inline=False)
+        names = await get_problem_names(self.bot.cf_client, problems)
+        for i, (problem_link, name) in enumerate(zip(problems, names)):
+            embed.add_field(name=f"Problem {i+1}", value=f"[{name or 'Link'}]({problem_link})", inline=False)
             view.add_item(discord.ui.Button(label=f"Check Solved - P{i+1}", style=discord.ButtonStyle.secondary, custom_id=f"check_{contest_id}_{i}"))
 
         participant_role_id = await get_cp_role_id(guild.id)
         participant_role = guild.get_role(participant_role_id) if participant_role_id else None
         
         await channel.send(content=f"{participant_role.mention if participant_role else 'Participants'}", embed=embed, view=view)
+        await self._post_scoreboard(channel, contest_id)
         print(f"Started contest {contest_id}")
 
     async def end_contest(self, guild: discord.Guild, contest_id: int, contest_name: str):
+        # Freeze the scoreboard with the final standings before the status change hides it
+        self.scoreboards.forget(contest_id)
+        await self._render_scoreboard(contest_id, final=True)
+        self.standings.pop(contest_id, None)
+        self._scoreboard_messages.pop(contest_id, None)
+
         await update_contest_status(contest_id, 'ENDED')
+        await self.announcements.flush(contest_id)
+        self.announcements.forget(contest_id)
         
         contest_channel_id = await get_contest_channel_id(guild.id)
         channel = self.bot.get_channel(contest_channel_id) if contest_channel_id else None
@@ -323,14 +633,14 @@ class ContestCommands(commands.GroupCog, name = "contest"):
                 winner = results[0]
                 winner_user = self.bot.get_user(int(winner['discord_id']))
                 winner_mention = winner_user.mention if winner_user else f"ID: {winner['discord_id']}"
-                embed.add_field(name="🏆 Champion", value=f"Congratulations to {winner_mention} for winning with **{winner['score']} points**!", inline=False)
+                embed.add_field(name="🏆 Champion", value=f"Congratulations to {winner_mention} for winning with **{winner['solved_count']} solved** ({winner['penalty']} penalty minutes)!", inline=False)
 
                 results_text_list = []
                 for r, res in enumerate(results, 1):
                     medal = "🥇" if r == 1 else "🥈" if r == 2 else "🥉" if r == 3 else f"**{r}.**"
                     user = self.bot.get_user(int(res['discord_id']))
                     user_mention = user.mention if user else f"ID: {res['discord_id']}"
-                    line = f"{medal} {user_mention} ({res['codeforces_handle']}) - **{res['score']} points**"
+                    line = f"{medal} {user_mention} ({res['codeforces_handle']}) - **{res['solved_count']} solved**, {res['penalty']} min ({res['score']} points)"
                     results_text_list.append(line)
                 results_text = "\n".join(results_text_list)
                 embed.add_field(name="Full Leaderboard", value=results_text, inline=False)
@@ -376,6 +686,7 @@ class ContestCommands(commands.GroupCog, name = "contest"):
             return
 
         await self.start_contest(interaction.guild, contest_id, contest_data['name'], problems, contest_data['duration'])
+        self.scheduler.remove(contest_id, START)
         await interaction.followup.send(f"Contest '{contest_data['name']}' has been started manually.", ephemeral=True)
 
     @app_commands.command(name="end", description="Immediately ends a contest.")
@@ -393,6 +704,7 @@ class ContestCommands(commands.GroupCog, name = "contest"):
             return
 
         await self.end_contest(interaction.guild, contest_id, contest_data['name'])
+        self.scheduler.remove(contest_id)
         await interaction.followup.send(f"Contest '{contest_data['name']}' has been ended manually.", ephemeral=True)
 
     @app_commands.command(name="info", description="Shows information and problems for a specific contest.")
@@ -406,7 +718,8 @@ class ContestCommands(commands.GroupCog, name = "contest"):
 
         start_time_display = f"<t:{contest_data['unix_timestamp']}:F> (<t:{contest_data['unix_timestamp']}:R>)" if contest_data.get('unix_timestamp') else "Not set"
         problems_list = await get_contest_problems(contest_id)
-        problems_display = "\n".join([f"{i+1}. [Problem Link]({link})" for i, link in enumerate(problems_list)]) or "No problems have been added yet."
+        names = await get_problem_names(self.bot.cf_client, problems_list)
+        problems_display = "\n".join([f"{i+1}. [{name or 'Problem Link'}]({link})" for i, (link, name) in enumerate(zip(problems_list, names))]) or "No problems have been added yet."
 
         participants = await get_contest_leaderboard(contest_id)
         leaderboard_display = "No participants yet."
@@ -417,14 +730,14 @@ class ContestCommands(commands.GroupCog, name = "contest"):
                 medal = "🥇" if r == 1 else "🥈" if r == 2 else "🥉" if r == 3 else f"**{r}.**"
                 user = self.bot.get_user(int(p['discord_id']))
                 user_mention = user.mention if user else f"ID: {p['discord_id']}"
-                line = f"{medal} {user_mention} ({p['codeforces_handle']}) - **{p['score']} pts**"
+                line = f"{medal} {user_mention} ({p['codeforces_handle']}) - **{p['solved_count']} solved**, {p['penalty']} min ({p['score']} pts)"
                 leaderboard_lines.append(line)
             leaderboard_display = "\n".join(leaderboard_lines)
             
             winner = participants[0]
             winner_user = self.bot.get_user(int(winner['discord_id']))
             winner_mention = winner_user.mention if winner_user else f"ID: {winner['discord_id']}"
-            winner_display = f"🎉 **Winner**: {winner_mention} with **{winner['score']}** points!"
+            winner_display = f"🎉 **Winner**: {winner_mention} with **{winner['solved_count']}** solved ({winner['penalty']} penalty minutes)!"
 
         embed = discord.Embed(title=f"Contest Info: {contest_data['name']}", description=winner_display or None, color=discord.Color.blue())
         embed.add_field(name="Contest ID", value=str(contest_id), inline=True)
@@ -449,25 +762,36 @@ class ContestCommands(commands.GroupCog, name = "contest"):
         limit = max(1, min(limit, 25))
         category_value = category.value if category else "overall"
 
-        leaderboard_data = await get_contest_custom_leaderboard(category_value, limit)
+        cache_key = ("contest", category_value, limit)
+        cached = leaderboard_cache.get(cache_key, category_value)
+        if cached is None:
+            version = leaderboard_cache.version
+            leaderboard_data = await get_contest_custom_leaderboard(category_value, limit)
+            embed = self._render_contest_leaderboard(category_value, leaderboard_data) if leaderboard_data else None
+            leaderboard_cache.put(cache_key, category_value, leaderboard_data, embed, version)
+        else:
+            leaderboard_data, embed = cached
+
         if not leaderboard_data:
             await interaction.followup.send("No contest participants found in this leaderboard category.", ephemeral=True)
             return
 
+        embed.timestamp = discord.utils.utcnow()
+        embed.set_footer(text=f"Requested by {interaction.user.display_name}")
+        await interaction.followup.send(embed=embed)
+
+    def _render_contest_leaderboard(self, category_value: str, leaderboard_data: List[Dict]) -> discord.Embed:
         category_names = {"daily": "Daily Points", "weekly": "Weekly Points", "monthly": "Monthly Points", "overall": "Overall Points"}
         category_display = category_names.get(category_value, "Overall Points")
 
         embed = discord.Embed(title=f"🏆 Contest Leaderboard ({category_display})", color=discord.Color.gold())
         
-        entries = [
-            f"**#{entry['rank']}:** {self.bot.get_user(int(entry['discord_id'])).mention if self.bot.get_user(int(entry['discord_id'])) else entry['codeforces_name']} - **{entry['score']}** points"
-            for entry in leaderboard_data
-        ]
+        entries = []
+        for entry in leaderboard_data:
+            user = self.bot.get_user(int(entry['discord_id']))
+            entries.append(f"**#{entry['rank']}:** {user.mention if user else entry['codeforces_name']} - **{entry['score']}** points")
         embed.description = "\n".join(entries) if entries else "No entries found for this category."
-
-        embed.timestamp = discord.utils.utcnow()
-        embed.set_footer(text=f"Requested by {interaction.user.display_name}")
-        await interaction.followup.send(embed=embed)
+        return embed
 
     @app_commands.command(name="history", description="Shows all past contests with their IDs and dates.")
     async def list_contests(self, interaction: discord.Interaction):
@@ -521,19 +845,27 @@ class ContestCommands(commands.GroupCog, name = "contest"):
             await interaction.followup.send("CP role not found or not configured.", ephemeral=True)
             return
 
-        for member in cp_role.members:
-            try: await member.send(message)
-            except discord.Forbidden: print(f"Could not send DM to {member.name}")
-            except Exception as e: print(f"An error occurred while sending DM to {member.name}: {e}")
-
         contest_channel_id = await get_contest_channel_id(interaction.guild.id)
         channel = self.bot.get_channel(contest_channel_id) if contest_channel_id else None
         if channel:
             await channel.send(f"{cp_role.mention} {message}")
-            await interaction.followup.send("Notification sent successfully!")
         else:
             await interaction.followup.send("Announcement channel not configured.", ephemeral=True)
 
+        # DMs go out in the background; the reply below is edited with progress and a final summary
+        recipients = [member.id for member in cp_role.members if not member.bot]
+        broadcast_id = await create_broadcast(interaction.guild.id, interaction.user.id, message, recipients)
+        progress_message = await interaction.followup.send(
+            embed=create_broadcast_embed(broadcast_id, {"total": len(recipients), "sent": 0, "failed": 0, "pending": len(recipients)}, False),
+            ephemeral=True,
+            wait=True
+        )
+
+        async def report(progress: Dict, done: bool):
+            await progress_message.edit(embed=create_broadcast_embed(broadcast_id, progress, done))
+
+        self.broadcaster.start(broadcast_id, on_progress=report)
+
 # --- Interaction Listener Cog ---
 
 class ContestInteractions(commands.Cog):
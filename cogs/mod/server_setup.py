@@ -3,7 +3,8 @@ from discord.ext import commands
 from discord import app_commands
 import aiosqlite
 import os
-from utility.config_manager import get_guild_settings # Import the new helper
+from utility.config_manager import get_guild_settings, load_guild_settings, refresh_guild_settings
+from utility.db_pragmas import apply_connection_pragmas, apply_database_pragmas, get_pragma_profile
 
 # --- Database Setup ---
 DB_PATH = "db/roles_and_channels.db"
@@ -12,6 +13,9 @@ async def init_db():
     """Initializes the database and creates the settings table if it doesn't exist."""
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     async with aiosqlite.connect(DB_PATH) as db:
+        _, pragmas = get_pragma_profile()
+        await apply_database_pragmas(db, pragmas)
+        await apply_connection_pragmas(db, pragmas)
         # Added columns for role names
         await db.execute("""
             CREATE TABLE IF NOT EXISTS guild_settings (
@@ -40,8 +44,9 @@ class SetupCommands(commands.Cog):
         self.bot = bot
 
     async def cog_load(self):
-        """Ensures the database is initialized when the cog is loaded."""
+        """Ensures the database is initialized and the settings cache warmed when the cog is loaded."""
         await init_db()
+        await load_guild_settings()
 
     @app_commands.command(name="setroles", description="Set the essential roles for the server.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -80,6 +85,9 @@ class SetupCommands(commands.Cog):
                 
                 await db.commit()
 
+            # Write-through so the cached settings match what was just saved
+            await refresh_guild_settings(guild_id)
+
             embed = discord.Embed(
                 title="✅ Roles Successfully Set",
                 description="The following roles have been configured for this server:",
@@ -123,6 +131,9 @@ class SetupCommands(commands.Cog):
                 
                 await db.commit()
 
+            # Write-through so the cached settings match what was just saved
+            await refresh_guild_settings(guild_id)
+
             embed = discord.Embed(
                 title="✅ Channels Successfully Set",
                 description="The following channels have been configured for this server:",
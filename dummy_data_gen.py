@@ -1,9 +1,9 @@
 import asyncio
 import random
 import string
-import json
 from datetime import datetime, timedelta
 import aiosqlite
+from utility.migrations import rebuild_score_aggregates
 
 # --- Configuration ---
 DB_FILE = "db/db.db"
@@ -18,6 +18,8 @@ async def generate_dummy_data():
         print("Wiping existing dummy data (if any)...")
         # Clear tables in the correct order to respect foreign key constraints
         await db.execute("DELETE FROM challenge_participants")
+        await db.execute("DELETE FROM contest_solves")
+        await db.execute("DELETE FROM contest_problems")
         await db.execute("DELETE FROM contest_participants")
         await db.execute("DELETE FROM users")
         await db.execute("DELETE FROM challenges")
@@ -115,25 +117,23 @@ async def generate_dummy_data():
             duration = random.randint(7200, 10800) # 2-3 hours in seconds
             end_time = start_time + timedelta(seconds=duration)
             
-            # Generate dummy problems and solves info
+            # Generate dummy problems
             num_problems = random.randint(3, 6)
-            problems_list = [f"Problem {c}" for c in string.ascii_uppercase[:num_problems]]
-            solves_info_dict = {p: random.randint(0, 8) for p in problems_list}
+            cf_contest_id = random.randint(1000, 2000)
+            problem_letters = string.ascii_uppercase[:num_problems]
 
             cur = await db.execute(
                 """
-                INSERT INTO contests (guild_id, cf_contest_id, name, start_time, end_time, duration, problems, solves_info, status, contest_type, unix_timestamp) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO contests (guild_id, cf_contest_id, name, start_time, end_time, duration, status, contest_type, unix_timestamp) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     random.randint(10**17, 10**18 - 1), # guild_id
-                    random.randint(1000, 2000), # cf_contest_id
+                    cf_contest_id,
                     f"Dummy Contest #{i+1}",
                     start_time,
                     end_time, # end_time
                     duration,
-                    json.dumps(problems_list), # problems
-                    json.dumps(solves_info_dict), # solves_info
                     "ENDED",
                     random.choice(['bot', 'codeforces']),
                     int(start_time.timestamp())
@@ -141,6 +141,15 @@ async def generate_dummy_data():
             )
             contest_id = cur.lastrowid
 
+            await db.executemany(
+                "INSERT INTO contest_problems (contest_id, position, link, cf_contest_id, problem_index) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (contest_id, position, f"https://codeforces.com/contest/{cf_contest_id}/problem/{letter}", cf_contest_id, letter)
+                    for position, letter in enumerate(problem_letters)
+                ]
+            )
+            first_solved = set()
+
             # Create a set of participants, ensuring our specific user is included
             participants = set(random.sample(user_ids, k=random.randint(3, 7)))
             participants.add(specific_user_id)
@@ -148,24 +157,50 @@ async def generate_dummy_data():
             for user_id in participants:
                 # User solves a subset of the available problems
                 solved_count = random.randint(1, num_problems)
-                solved_problems_list = random.sample(problems_list, k=solved_count)
+                solved_positions = random.sample(range(num_problems), k=solved_count)
+
+                score = 0
+                for position in solved_positions:
+                    is_first = position not in first_solved
+                    first_solved.add(position)
+                    points = random.randint(8, 35) + (3 if is_first else 0)
+                    score += points
+                    await db.execute(
+                        """
+                        INSERT INTO contest_solves (contest_id, position, user_id, points, solved_at, is_first)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            contest_id,
+                            position,
+                            user_id,
+                            points,
+                            int(start_time.timestamp()) + random.randint(60, duration),
+                            is_first
+                        )
+                    )
 
                 await db.execute(
                     """
-                    INSERT INTO contest_participants (contest_id, user_id, score, solved_problems, joined_at) 
-                    VALUES (?, ?, ?, ?, ?)
+                    INSERT INTO contest_participants (contest_id, user_id, score, joined_at) 
+                    VALUES (?, ?, ?, ?)
                     """,
                     (
                         contest_id,
                         user_id,
-                        random.randint(100, 2500),
-                        json.dumps(solved_problems_list),
+                        score,
                         start_time
                     )
                 )
         await db.commit()
         print("Contests inserted.")
 
+        # Leaderboards read from score_aggregates, so rebuild it from the rows above
+        print("Rebuilding score aggregates...")
+        await rebuild_score_aggregates(db)
+        await db.commit()
+        print("Score aggregates rebuilt.")
+
         print("\n✅ Dummy data inserted successfully!")
 
 if __name__ == "__main__":
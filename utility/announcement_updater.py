@@ -0,0 +1,70 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Set
+
+
+# Minimum time between two re-renders of the same contest announcement
+ANNOUNCEMENT_UPDATE_SECONDS = 10
+
+
+class AnnouncementUpdater:
+    """
+    Coalesces contest announcement edits.
+
+    mark_dirty() only records that a contest's announcement is out of date;
+    each dirty contest is re-rendered at most once per interval, with
+    whatever the latest state is at that moment. A burst of joins therefore
+    costs one render (queries + message edit) per interval instead of one
+    per join. flush() renders a dirty contest immediately, e.g. when it starts.
+    """
+
+    def __init__(self, render: Callable[[int], Awaitable[None]], interval: float = ANNOUNCEMENT_UPDATE_SECONDS):
+        self.render = render
+        self.interval = interval
+        self._dirty: Set[int] = set()
+        self._last_render: Dict[int, float] = {}
+        self._timers: Dict[int, asyncio.Task] = {}
+
+    def mark_dirty(self, contest_id: int) -> None:
+        """Schedule a re-render of the contest's announcement."""
+        self._dirty.add(contest_id)
+        if contest_id in self._timers:
+            return  # already scheduled; it will pick up the latest state
+        delay = max(0.0, self._last_render.get(contest_id, 0.0) + self.interval - time.monotonic())
+        self._timers[contest_id] = asyncio.create_task(self._render_later(contest_id, delay))
+
+    async def flush(self, contest_id: int) -> None:
+        """Render the contest's announcement now if it has pending changes."""
+        timer = self._timers.pop(contest_id, None)
+        if timer:
+            timer.cancel()
+        await self._render_now(contest_id)
+
+    def forget(self, contest_id: int) -> None:
+        """Drop any pending update and bookkeeping for a contest."""
+        timer = self._timers.pop(contest_id, None)
+        if timer:
+            timer.cancel()
+        self._dirty.discard(contest_id)
+        self._last_render.pop(contest_id, None)
+
+    def close(self) -> None:
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+
+    async def _render_later(self, contest_id: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # Unregister before rendering so flush() never cancels an edit in flight
+        self._timers.pop(contest_id, None)
+        await self._render_now(contest_id)
+
+    async def _render_now(self, contest_id: int) -> None:
+        if contest_id not in self._dirty:
+            return
+        self._dirty.discard(contest_id)
+        self._last_render[contest_id] = time.monotonic()
+        try:
+            await self.render(contest_id)
+        except Exception as e:
+            print(f"Error updating announcement for contest {contest_id}: {e}")
@@ -0,0 +1,135 @@
+import asyncio
+import discord
+from typing import Awaitable, Callable, Dict, Optional
+
+from utility.rate_limit import TokenBucket
+from utility.db_helpers import (
+    get_broadcast, get_unfinished_broadcasts, get_pending_broadcast_recipients,
+    set_broadcast_recipient_status, finish_broadcast, get_broadcast_summary
+)
+
+
+# DMs in flight at once for a single broadcast
+DM_CONCURRENCY = 5
+# Shared by every broadcast; each DM is two REST calls (open channel + send),
+# so this stays well inside Discord's global limit of 50 requests per second
+DM_RATE = 5.0
+DM_BURST = 5
+# How often a running broadcast reports its progress
+PROGRESS_INTERVAL = 5
+
+ProgressCallback = Callable[[Dict, bool], Awaitable[None]]
+
+
+class Broadcaster:
+    """
+    Sends a stored broadcast message as DMs in the background.
+
+    Recipients are worked through by a few concurrent workers that all draw
+    from one token bucket. Every delivery result is written to the database
+    as it happens, so a broadcast interrupted by a restart resumes with the
+    recipients it hasn't tried yet instead of messaging everyone again.
+    """
+
+    def __init__(self, bot, concurrency: int = DM_CONCURRENCY, rate: float = DM_RATE, burst: int = DM_BURST):
+        self.bot = bot
+        self.concurrency = max(1, concurrency)
+        self._bucket = TokenBucket(rate, burst)
+        self._jobs: Dict[int, asyncio.Task] = {}
+        self._stopping = False
+
+    def start(self, broadcast_id: int, on_progress: Optional[ProgressCallback] = None) -> asyncio.Task:
+        """Start (or return the already running) job for a broadcast."""
+        job = self._jobs.get(broadcast_id)
+        if job is None or job.done():
+            job = asyncio.create_task(self._run(broadcast_id, on_progress))
+            self._jobs[broadcast_id] = job
+            job.add_done_callback(lambda _: self._jobs.pop(broadcast_id, None))
+        return job
+
+    async def resume(self) -> None:
+        """Restart every broadcast that was still sending when the bot stopped."""
+        for broadcast in await get_unfinished_broadcasts():
+            print(f"Resuming broadcast {broadcast['broadcast_id']}")
+            self.start(broadcast['broadcast_id'])
+
+    async def close(self, timeout: float = 10) -> None:
+        """
+        Stop handing out recipients and let DMs already in flight record their
+        result, so nothing is sent twice after a restart. Unsent recipients stay
+        PENDING and are picked up by resume().
+        """
+        self._stopping = True
+        jobs = list(self._jobs.values())
+        if jobs:
+            _, unfinished = await asyncio.wait(jobs, timeout=timeout)
+            for job in unfinished:
+                job.cancel()
+        self._jobs.clear()
+
+    async def _run(self, broadcast_id: int, on_progress: Optional[ProgressCallback]) -> Optional[Dict]:
+        broadcast = await get_broadcast(broadcast_id)
+        if not broadcast:
+            return None
+        guild = self.bot.get_guild(broadcast['guild_id'])
+
+        progress = await get_broadcast_summary(broadcast_id)
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for discord_id in await get_pending_broadcast_recipients(broadcast_id):
+            queue.put_nowait(discord_id)
+
+        async def worker():
+            while not queue.empty() and not self._stopping:
+                discord_id = queue.get_nowait()
+                error = await self._deliver(guild, discord_id, broadcast['message'])
+                await set_broadcast_recipient_status(broadcast_id, discord_id, 'FAILED' if error else 'SENT', error)
+                progress['pending'] -= 1
+                progress['failed' if error else 'sent'] += 1
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, queue.qsize()))]
+        try:
+            pending = set(workers)
+            while pending:
+                _, pending = await asyncio.wait(pending, timeout=PROGRESS_INTERVAL)
+                if pending and on_progress:
+                    await self._report(on_progress, progress, False)
+            for task in workers:
+                if task.exception():
+                    print(f"Broadcast {broadcast_id} worker failed: {task.exception()}")
+        finally:
+            for task in workers:
+                task.cancel()
+
+        if not queue.empty():
+            return None  # shutting down; resume() continues from here
+
+        await finish_broadcast(broadcast_id)
+        summary = await get_broadcast_summary(broadcast_id)
+        print(f"Broadcast {broadcast_id} finished: {summary['sent']} sent, {summary['failed']} failed")
+        if on_progress:
+            await self._report(on_progress, summary, True)
+        return summary
+
+    @staticmethod
+    async def _report(on_progress: ProgressCallback, progress: Dict, done: bool) -> None:
+        try:
+            await on_progress(progress, done)
+        except Exception as e:
+            print(f"Error reporting broadcast progress: {e}")
+
+    async def _deliver(self, guild: Optional[discord.Guild], discord_id: int, message: str) -> Optional[str]:
+        """Send one DM; returns None on success or a short reason on failure."""
+        user = (guild.get_member(discord_id) if guild else None) or self.bot.get_user(discord_id)
+        if user is None:
+            return "No longer in the server"
+        await self._bucket.acquire()
+        try:
+            await user.send(message)
+        except discord.Forbidden:
+            return "DMs are closed"
+        except discord.HTTPException as e:
+            if e.status == 429:
+                # discord.py already retried; back the whole bucket off before the next DM
+                self._bucket.penalize(PROGRESS_INTERVAL)
+            return f"HTTP {e.status}: {e.text or 'request failed'}"
+        return None
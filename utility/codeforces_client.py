@@ -0,0 +1,192 @@
+import aiohttp
+import asyncio
+import itertools
+import json
+import random
+from typing import Any, Dict, Optional, Set
+
+from utility.rate_limit import TokenBucket
+
+
+API_BASE_URL = "https://codeforces.com/api/"
+
+# Codeforces documents a limit of roughly one call per two seconds
+DEFAULT_RATE = 0.5
+DEFAULT_BURST = 3
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0
+BACKOFF_CAP = 30.0
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+# Priority lanes, lower runs first
+PRIORITY_INTERACTIVE = 0  # a user is waiting on the answer (solve checks, /authenticate)
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2   # refreshes and polling that nobody is blocked on
+
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class CodeforcesError(Exception):
+    """Base class for Codeforces API failures."""
+
+
+class CodeforcesAPIError(CodeforcesError):
+    """Codeforces answered the call with status FAILED (e.g. unknown handle)."""
+
+    def __init__(self, comment: str):
+        super().__init__(comment)
+        self.comment = comment
+
+
+class CodeforcesUnavailableError(CodeforcesError):
+    """Codeforces could not be reached, or kept rate-limiting us after every retry."""
+
+
+class _RetryableError(Exception):
+    """Transient failure (throttling, 5xx, network) worth retrying."""
+
+
+class _Request:
+    __slots__ = ("method", "params", "priority", "large", "attempt", "future")
+
+    def __init__(self, method: str, params: Dict, priority: int, large: bool, future: asyncio.Future):
+        self.method = method
+        self.params = params
+        self.priority = priority
+        self.large = large
+        self.attempt = 0
+        self.future = future
+
+
+class CodeforcesClient:
+    """
+    Single entry point for every call to the Codeforces API.
+
+    Requests are queued in priority lanes and released through a token
+    bucket, so interactive calls jump ahead of background refreshes without
+    the bot as a whole exceeding the API's rate limit. 429/5xx responses and
+    "Call limit exceeded" comments are retried with jittered exponential
+    backoff, and large payloads are decoded off the event loop.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, max_retries: int = MAX_RETRIES):
+        self.session = session
+        self.max_retries = max_retries
+        self._bucket = TokenBucket(rate, burst)
+        self._queue: "asyncio.PriorityQueue" = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._closed = False
+
+    async def call(self, method: str, params: Optional[Dict] = None, priority: int = PRIORITY_NORMAL, large: bool = False) -> Any:
+        """
+        Call an API method (e.g. "user.info") and return its `result` field.
+        Raises CodeforcesAPIError or CodeforcesUnavailableError on failure.
+        """
+        if self._closed:
+            raise CodeforcesUnavailableError("Codeforces client is closed")
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(_Request(method, params or {}, priority, large, future))
+        return await future
+
+    async def close(self) -> None:
+        """Stop sending requests; every caller still waiting gets CodeforcesUnavailableError."""
+        self._closed = True
+        tasks = list(self._in_flight)
+        if self._worker is not None:
+            tasks.append(self._worker)
+            self._worker = None
+        for task in tasks:
+            task.cancel()
+        # In-flight requests fail their own futures when cancelled (see _perform)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while not self._queue.empty():
+            _, _, request = self._queue.get_nowait()
+            self._resolve(request, exception=CodeforcesUnavailableError("Codeforces client is closed"))
+
+    def _enqueue(self, request: _Request) -> None:
+        self._queue.put_nowait((request.priority, next(self._seq), request))
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._bucket.acquire()
+            except asyncio.CancelledError:
+                self._queue.put_nowait(item)  # failed by close() with the rest of the queue
+                raise
+            # Re-queue and pop again so a higher priority request that arrived
+            # while we waited for a token goes first.
+            self._queue.put_nowait(item)
+            _, _, request = self._queue.get_nowait()
+            if request.future.done():
+                continue  # caller gave up
+            task = asyncio.create_task(self._perform(request))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _perform(self, request: _Request) -> None:
+        try:
+            await self._attempt(request)
+        except asyncio.CancelledError:
+            self._resolve(request, exception=CodeforcesUnavailableError("Codeforces client is closed"))
+            raise
+
+    async def _attempt(self, request: _Request) -> None:
+        try:
+            result = await self._request(request)
+        except _RetryableError as e:
+            if request.attempt >= self.max_retries:
+                self._resolve(request, exception=CodeforcesUnavailableError(str(e)))
+                return
+            delay = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** request.attempt))
+            delay = random.uniform(delay / 2, delay)
+            request.attempt += 1
+            self._bucket.penalize(delay / 2)
+            print(f"Codeforces {request.method} throttled ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            self._enqueue(request)
+        except CodeforcesError as e:
+            self._resolve(request, exception=e)
+        except Exception as e:
+            self._resolve(request, exception=CodeforcesUnavailableError(str(e)))
+        else:
+            self._resolve(request, result=result)
+
+    @staticmethod
+    def _resolve(request: _Request, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        if request.future.done():
+            return
+        if exception is not None:
+            request.future.set_exception(exception)
+        else:
+            request.future.set_result(result)
+
+    async def _request(self, request: _Request) -> Any:
+        try:
+            async with self.session.get(API_BASE_URL + request.method, params=request.params, timeout=REQUEST_TIMEOUT) as resp:
+                if resp.status in RETRYABLE_STATUSES:
+                    raise _RetryableError(f"HTTP {resp.status}")
+                body = await resp.read()
+                status = resp.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise _RetryableError(str(e) or type(e).__name__)
+
+        try:
+            if request.large:
+                data = await asyncio.to_thread(json.loads, body)
+            else:
+                data = json.loads(body)
+        except ValueError:
+            raise _RetryableError(f"HTTP {status} with a non-JSON body")
+
+        if data.get("status") != "OK":
+            comment = data.get("comment", "Unknown error")
+            if "limit exceeded" in comment.lower():
+                raise _RetryableError(comment)
+            raise CodeforcesAPIError(comment)
+        return data.get("result")
@@ -0,0 +1,44 @@
+import hashlib
+import json
+import os
+from typing import List, Optional
+
+from discord import app_commands
+
+
+# Fingerprint of the last command tree synced to Discord
+COMMAND_HASH_PATH = "db/command_tree.sha256"
+
+
+def command_tree_fingerprint(tree: app_commands.CommandTree) -> str:
+    """Hash of the global command payloads exactly as tree.sync() would upload them."""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda c: (c.get("type", 1), c["name"])
+    )
+    data = {"application_id": tree.client.application_id, "commands": payload}
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _read_fingerprint(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+async def sync_command_tree(tree: app_commands.CommandTree, force: bool = False, path: str = COMMAND_HASH_PATH) -> Optional[List[app_commands.AppCommand]]:
+    """
+    Sync the global commands only if they changed since the last sync.
+    Returns the synced commands, or None if the stored fingerprint matched.
+    """
+    fingerprint = command_tree_fingerprint(tree)
+    if not force and fingerprint == _read_fingerprint(path):
+        return None
+
+    synced = await tree.sync()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(fingerprint)
+    return synced
@@ -5,17 +5,44 @@ from typing import Optional, Dict
 # This should point to the same database file used by the setup commands.
 DB_PATH = "db/roles_and_channels.db"
 
-async def get_guild_settings(guild_id: int) -> Dict:
-    """
-    Fetches all settings for a given guild from the database and caches the result.
-    
-    Args:
-        guild_id: The ID of the guild to fetch settings for.
-        
-    Returns:
-        A dictionary containing the settings, or an empty dictionary if not found.
-    """
-    
+# --- Settings Cache ---
+# guild_id -> settings row. Filled once by load_guild_settings() at startup and
+# kept current by refresh_guild_settings() whenever /setroles or /setchannels write.
+_settings_cache: Dict[int, Dict] = {}
+_cache_loaded = False
+
+async def load_guild_settings() -> None:
+    """Loads the settings of every guild into the in-process cache."""
+    global _cache_loaded
+    try:
+        async with aiosqlite.connect(DB_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute("SELECT * FROM guild_settings")
+            rows = await cursor.fetchall()
+    except aiosqlite.OperationalError as e:
+        print(f"Database error (is the table created and up-to-date?): {e}")
+        return
+
+    _settings_cache.clear()
+    for row in rows:
+        _settings_cache[row["guild_id"]] = dict(row)
+    _cache_loaded = True
+    print(f"Loaded settings for {len(_settings_cache)} guild(s)")
+
+async def refresh_guild_settings(guild_id: int) -> Dict:
+    """Re-reads one guild's settings into the cache (call after writing them)."""
+    settings = await _fetch_guild_settings(guild_id)
+    if settings is None:
+        # Query failed; keep what we had rather than forget a configured guild
+        return _settings_cache.get(guild_id, {})
+    if settings:
+        _settings_cache[guild_id] = settings
+    else:
+        _settings_cache.pop(guild_id, None)
+    return settings
+
+async def _fetch_guild_settings(guild_id: int) -> Optional[Dict]:
+    """Returns the guild's settings row, {} if it has none, or None if the query failed."""
     try:
         async with aiosqlite.connect(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
@@ -30,9 +57,28 @@ async def get_guild_settings(guild_id: int) -> Dict:
         # The table in `setup_commands.py` should be updated to include:
         # cp_role_name TEXT, mod_role_name TEXT, auth_role_name TEXT, mentor_role_name TEXT
         print(f"Database error (is the table created and up-to-date?): {e}")
+        return None
 
     return {}
 
+async def get_guild_settings(guild_id: int) -> Dict:
+    """
+    Fetches all settings for a given guild, served from the in-process cache.
+    
+    Args:
+        guild_id: The ID of the guild to fetch settings for.
+        
+    Returns:
+        A dictionary containing the settings, or an empty dictionary if not found.
+    """
+    settings = _settings_cache.get(guild_id)
+    if settings is not None:
+        return dict(settings)
+    if _cache_loaded:
+        # Every configured guild is in the cache, so this one has no settings yet
+        return {}
+    return dict(await refresh_guild_settings(guild_id))
+
 # --- Role ID Getters ---
 
 async def get_cp_role_id(guild_id: int) -> Optional[int]:
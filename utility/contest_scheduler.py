@@ -0,0 +1,98 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utility.db_helpers import get_pending_and_active_contests
+
+
+# Never sleep longer than this in one go, so wall-clock jumps (NTP, suspend) are picked up
+MAX_SLEEP_SECONDS = 300
+
+START = "start"
+END = "end"
+
+
+def contest_deadlines(contest_data: Dict) -> Optional[Tuple[float, float]]:
+    """Return the (start, end) unix times of a contest, or None if it has no usable start."""
+    start_ts = contest_data.get('unix_timestamp')
+    if start_ts is None:
+        try:
+            start_ts = datetime.fromisoformat(contest_data['start_time']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return None
+    return float(start_ts), float(start_ts) + contest_data['duration'] * 60
+
+
+class ContestScheduler:
+    """
+    Timer heap of contest start/end deadlines.
+
+    Deadlines are loaded once from the database and the scheduler then sleeps
+    until the earliest one is due. schedule() and remove() wake it up so a new
+    or manually started/ended contest takes effect immediately. Stale heap
+    entries are skipped lazily rather than removed in place.
+    """
+
+    def __init__(self, on_due: Callable[[str, int], Awaitable[None]]):
+        self.on_due = on_due
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._deadlines: Dict[Tuple[str, int], float] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def schedule(self, contest_data: Dict) -> None:
+        """Register the contest's upcoming start and/or end deadline."""
+        deadlines = contest_deadlines(contest_data)
+        if deadlines is None:
+            print(f"Contest {contest_data['contest_id']} has no valid start time, not scheduling it.")
+            return
+        start_ts, end_ts = deadlines
+        contest_id = contest_data['contest_id']
+        if contest_data['status'] == 'PENDING':
+            self._push(START, contest_id, start_ts)
+        if contest_data['status'] in ('PENDING', 'ACTIVE'):
+            self._push(END, contest_id, end_ts)
+        self._wakeup.set()
+
+    def remove(self, contest_id: int, kind: Optional[str] = None) -> None:
+        """Forget a contest's deadlines (both, or just `kind`)."""
+        for k in ((kind,) if kind else (START, END)):
+            self._deadlines.pop((k, contest_id), None)
+        self._wakeup.set()
+
+    def retry(self, kind: str, contest_id: int, delay: float) -> None:
+        """Fire a deadline again `delay` seconds from now (e.g. a start that couldn't happen yet)."""
+        self._push(kind, contest_id, time.time() + delay)
+        self._wakeup.set()
+
+    def _push(self, kind: str, contest_id: int, when: float) -> None:
+        self._deadlines[(kind, contest_id)] = when
+        heapq.heappush(self._heap, (when, next(self._seq), kind, contest_id))
+
+    async def run(self) -> None:
+        for contest_data in await get_pending_and_active_contests():
+            self.schedule(contest_data)
+
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                when, _, kind, contest_id = heapq.heappop(self._heap)
+                if self._deadlines.get((kind, contest_id)) != when:
+                    continue  # removed or rescheduled since it was pushed
+                del self._deadlines[(kind, contest_id)]
+                try:
+                    await self.on_due(kind, contest_id)
+                except Exception as e:
+                    print(f"Error handling contest {contest_id} {kind}: {e}")
+
+            timeout = MAX_SLEEP_SECONDS
+            if self._heap:
+                timeout = min(timeout, max(0.0, self._heap[0][0] - time.time()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
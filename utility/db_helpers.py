@@ -1,13 +1,184 @@
 import aiosqlite
+import asyncio
 import os
 import json
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+from utility.db_pool import ConnectionPool
+from utility.leaderboard_cache import leaderboard_cache
+from utility.standings import PENALTY_PER_WRONG_ATTEMPT
+from utility.db_pragmas import CheckpointManager, apply_connection_pragmas, apply_database_pragmas, get_pragma_profile
+from utility.migrations import SCORE_BUCKETS, migrate, score_bucket_sql
+from utility.problem_links import parse_problem_link
 
 
 # Global database path
 DB_PATH = "db/db.db"
 
+# Shared connection pool, opened by the bot in setup_hook via open_pool().
+# Helpers fall back to a one-off connection when it isn't open (e.g. scripts).
+_pool: Optional[ConnectionPool] = None
+
+# Keeps the WAL file in check while the pool is open (WAL profiles only)
+_checkpointer = None
+
+
+async def open_pool(readers: int = 4) -> None:
+    """Open the long-lived connection pool used by every helper."""
+    global _pool, _checkpointer
+    if _pool is not None and not _pool.closed:
+        return
+    _, pragmas = get_pragma_profile()
+    _pool = ConnectionPool(DB_PATH, readers=readers, pragmas=pragmas)
+    await _pool.open()
+    if pragmas['journal_mode'] == "WAL":
+        _checkpointer = CheckpointManager(checkpoint_wal)
+        _checkpointer.start()
+
+
+async def close_pool() -> None:
+    """Close the connection pool, if one is open."""
+    global _pool, _checkpointer
+    await _write_batcher.close()
+    if _checkpointer is not None:
+        await _checkpointer.stop()
+        _checkpointer = None
+        await checkpoint_wal("TRUNCATE")
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def checkpoint_wal(mode: str = "PASSIVE") -> Optional[Tuple[int, int, int]]:
+    """Run a WAL checkpoint; returns (busy, log pages, checkpointed pages)."""
+    async with _write_db() as db:
+        cursor = await db.execute(f"PRAGMA wal_checkpoint({mode})")
+        row = await cursor.fetchone()
+        return tuple(row) if row else None
+
+
+@asynccontextmanager
+async def _connect():
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        await apply_connection_pragmas(db, get_pragma_profile()[1])
+        yield db
+
+
+@asynccontextmanager
+async def _read_db():
+    """Yield a connection for read-only queries."""
+    if _pool is not None and not _pool.closed:
+        async with _pool.reader() as db:
+            yield db
+    else:
+        async with _connect() as db:
+            yield db
+
+
+@asynccontextmanager
+async def _write_db():
+    """Yield the (exclusive) connection for statements that modify the database."""
+    if _pool is not None and not _pool.closed:
+        async with _pool.writer() as db:
+            yield db
+    else:
+        async with _connect() as db:
+            yield db
+
+
+# How long the write-behind queue waits to gather more writes into a batch
+WRITE_BATCH_WINDOW = 0.005
+WRITE_BATCH_MAX = 500
+
+
+class WriteBatcher:
+    """
+    Write-behind queue for small, frequent mutations.
+
+    Each submitted operation is an async callable that runs its statements on
+    the writer connection without committing. Operations queued within the
+    batch window are applied in one transaction, each inside its own
+    SAVEPOINT so a failing operation is rolled back alone, and committed
+    together. A caller's future resolves only after that commit, so the write
+    is durable by the time submit() returns.
+    """
+
+    def __init__(self, window: float = WRITE_BATCH_WINDOW, max_batch: int = WRITE_BATCH_MAX):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, op: Callable[[aiosqlite.Connection], Awaitable[Any]]) -> Any:
+        """Queue `op` and wait until its batch is committed; returns op's result."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((op, future))
+        return await future
+
+    async def close(self) -> None:
+        """Apply everything still queued, then stop the worker."""
+        if self._worker is None or self._worker.done():
+            return
+        self._queue.put_nowait(None)
+        await self._worker
+        self._worker = None
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            await asyncio.sleep(self.window)
+            batch = [item]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._apply(batch)
+
+    async def _apply(self, batch: list) -> None:
+        results = []
+        try:
+            async with _write_db() as db:
+                await db.execute("BEGIN")
+                for i, (op, future) in enumerate(batch):
+                    await db.execute(f"SAVEPOINT op_{i}")
+                    try:
+                        result = await op(db)
+                    except Exception as e:
+                        await db.execute(f"ROLLBACK TO op_{i}")
+                        results.append((future, None, e))
+                    else:
+                        results.append((future, result, None))
+                    await db.execute(f"RELEASE op_{i}")
+                await db.commit()
+        except Exception as e:
+            print(f"Error committing batch of {len(batch)} writes: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# Shared write-behind queue for score and solve updates
+_write_batcher = WriteBatcher()
+
 
 async def init_db() -> None:
     """
@@ -19,6 +190,11 @@ async def init_db() -> None:
     
     async with aiosqlite.connect(DB_PATH) as db:
         db.row_factory = aiosqlite.Row
+
+        profile_name, pragmas = get_pragma_profile()
+        journal_mode = await apply_database_pragmas(db, pragmas)
+        await apply_connection_pragmas(db, pragmas)
+        print(f"Database pragma profile '{profile_name}' (journal_mode={journal_mode})")
         
         # Users table
         await db.execute("""
@@ -93,23 +269,138 @@ async def init_db() -> None:
         
         await db.commit()
 
+        # Indexes and later schema changes are applied as versioned migrations
+        await migrate(db)
+
+
+# Leaderboard category -> score_aggregates period
+LEADERBOARD_PERIODS = {"daily": "day", "weekly": "week", "monthly": "month", "overall": "all"}
+
+
+async def _add_to_score_aggregates(db: aiosqlite.Connection, user_id: int, contest_points: int = 0, challenge_points: int = 0, earned_at: Optional[str] = None) -> None:
+    """
+    Add points to the user's day/week/month/all-time buckets (caller commits).
+    `earned_at` picks the buckets by the same rule as rebuild_score_aggregates:
+    the participant's joined_at for contest points, the challenge's created_at
+    for challenge points. Defaults to now.
+    """
+    if not contest_points and not challenge_points:
+        return
+    earned = "COALESCE(?, 'now')"
+    values = ", ".join(f"(?, '{period}', {score_bucket_sql(period, earned)}, ?, ?, ?)" for period in SCORE_BUCKETS)
+    params = []
+    for period in SCORE_BUCKETS:
+        params.append(user_id)
+        if "{ts}" in SCORE_BUCKETS[period]:  # the 'all' bucket takes no timestamp
+            params.append(earned_at)
+        params.extend((contest_points, challenge_points, contest_points + challenge_points))
+    await db.execute(f"""
+        INSERT INTO score_aggregates (user_id, period, bucket, contest_score, challenge_score, total_score)
+        VALUES {values}
+        ON CONFLICT (period, bucket, user_id) DO UPDATE SET
+            contest_score = contest_score + excluded.contest_score,
+            challenge_score = challenge_score + excluded.challenge_score,
+            total_score = total_score + excluded.total_score
+    """, params)
+
+
+# Maximum number of users kept in the identity cache
+IDENTITY_CACHE_SIZE = 2048
+
+
+class UserIdentityCache:
+    """
+    LRU map of discord_id -> {"user_id", "discord_id", "cf_handle"}.
+
+    These fields only change when a user is added, removed or re-linked, so
+    the helpers that write users invalidate entries explicitly and everything
+    else can skip the users lookup that most queries start with. Unknown
+    users are not cached, so someone who just authenticated is found at once.
+    """
+
+    def __init__(self, max_entries: int = IDENTITY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def get(self, discord_id: str) -> Optional[Dict]:
+        identity = self._entries.get(discord_id)
+        if identity is not None:
+            self._entries.move_to_end(discord_id)
+        return identity
+
+    def put(self, user_id: int, discord_id: str, cf_handle: str) -> None:
+        self._entries[discord_id] = {"user_id": user_id, "discord_id": discord_id, "cf_handle": cf_handle}
+        self._entries.move_to_end(discord_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, discord_id: str = None, cf_handle: str = None) -> None:
+        if discord_id is not None:
+            self._entries.pop(discord_id, None)
+        if cf_handle is not None:
+            for key in [k for k, v in self._entries.items() if v["cf_handle"].lower() == cf_handle.lower()]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_identity_cache = UserIdentityCache()
+
 
 async def add_user(discord_id: str, cf_handle: str) -> int:
     """Add a new user and return their user_id."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _write_db() as db:
         cursor = await db.execute(
             "INSERT INTO users (discord_id, cf_handle) VALUES (?, ?)",
             (discord_id, cf_handle)
         )
         await db.commit()
+        _identity_cache.put(cursor.lastrowid, discord_id, cf_handle)
         return cursor.lastrowid
 
 
+async def get_users_by_discord_ids(discord_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Look up the user_id and cf_handle of many users at once.
+    Returns {discord_id: {"user_id", "discord_id", "cf_handle"}} for the registered ones.
+    """
+    found: Dict[str, Dict] = {}
+    missing: List[str] = []
+    for discord_id in dict.fromkeys(str(d) for d in discord_ids):
+        identity = _identity_cache.get(discord_id)
+        if identity is not None:
+            found[discord_id] = identity
+        else:
+            missing.append(discord_id)
+
+    if missing:
+        async with _read_db() as db:
+            placeholders = ", ".join("?" * len(missing))
+            cursor = await db.execute(
+                f"SELECT user_id, discord_id, cf_handle FROM users WHERE discord_id IN ({placeholders})",
+                missing
+            )
+            for row in await cursor.fetchall():
+                _identity_cache.put(row['user_id'], row['discord_id'], row['cf_handle'])
+                found[row['discord_id']] = _identity_cache.get(row['discord_id'])
+    return found
+
+
+async def get_cf_handles(discord_ids: List[str]) -> Dict[str, str]:
+    """Get {discord_id: cf_handle} for every registered user among `discord_ids`."""
+    users = await get_users_by_discord_ids(discord_ids)
+    return {discord_id: user['cf_handle'] for discord_id, user in users.items()}
+
+
+async def _get_user_id(discord_id: str) -> Optional[int]:
+    user = (await get_users_by_discord_ids([discord_id])).get(str(discord_id))
+    return user['user_id'] if user else None
+
+
 async def get_user_by_discord(discord_id: str) -> Optional[Dict]:
     """Get user by Discord ID, returns None if not found."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute(
             "SELECT * FROM users WHERE discord_id = ?",
             (discord_id,)
@@ -120,8 +411,7 @@ async def get_user_by_discord(discord_id: str) -> Optional[Dict]:
 
 async def create_challenge(problem_id: str, problem_name: str = None, problem_link: str = None) -> int:
     """Create a new challenge and return the challenge_id."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _write_db() as db:
         cursor = await db.execute(
             "INSERT INTO challenges (problem_id, problem_name, problem_link) VALUES (?, ?, ?)",
             (problem_id, problem_name, problem_link)
@@ -139,15 +429,91 @@ async def add_challenge_participant(
     rank: int = None
 ) -> None:
     """Add a participant to a challenge."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async def op(db):
         await db.execute(
             "INSERT INTO challenge_participants (challenge_id, user_id, score_awarded, is_winner, finish_time, rank) VALUES (?, ?, ?, ?, ?, ?)",
             (challenge_id, user_id, score_awarded, is_winner, finish_time, rank)
         )
+        cursor = await db.execute("SELECT created_at FROM challenges WHERE challenge_id = ?", (challenge_id,))
+        challenge = await cursor.fetchone()
+        await _add_to_score_aggregates(
+            db, user_id, challenge_points=score_awarded or 0, earned_at=challenge['created_at'] if challenge else None
+        )
+
+    await _write_batcher.submit(op)
+    leaderboard_cache.invalidate()
+
+
+async def create_challenge_session(
+    challenge_id: int,
+    channel_id: int,
+    message_id: int,
+    cf_contest_id: int,
+    problem_index: str,
+    problem_name: str,
+    problem_link: str,
+    problem_rating: Optional[int],
+    started_ts: int,
+    handle_map: Dict[str, Optional[str]]
+) -> None:
+    """Persist a running challenge and its participants (discord_id -> cf_handle)."""
+    async with _write_db() as db:
+        await db.execute(
+            """INSERT OR REPLACE INTO challenge_sessions
+               (challenge_id, channel_id, message_id, cf_contest_id, problem_index, problem_name, problem_link, problem_rating, started_ts)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (challenge_id, channel_id, message_id, cf_contest_id, problem_index, problem_name, problem_link, problem_rating, started_ts)
+        )
+        await db.executemany(
+            "INSERT OR REPLACE INTO challenge_session_participants (challenge_id, discord_id, cf_handle) VALUES (?, ?, ?)",
+            [(challenge_id, discord_id, handle) for discord_id, handle in handle_map.items()]
+        )
         await db.commit()
 
 
+async def get_active_challenge_sessions() -> List[Dict]:
+    """
+    Get every ACTIVE challenge session with its participants in one query.
+    Each session dict has a 'participants' list of participant rows.
+    """
+    async with _read_db() as db:
+        cursor = await db.execute("""
+            SELECT s.*, p.discord_id, p.cf_handle, p.state, p.points, p.finish_pos
+            FROM challenge_sessions s
+            JOIN challenge_session_participants p ON p.challenge_id = s.challenge_id
+            WHERE s.status = 'ACTIVE'
+            ORDER BY s.challenge_id
+        """)
+        sessions: Dict[int, Dict] = {}
+        for row in await cursor.fetchall():
+            row = dict(row)
+            participant = {key: row.pop(key) for key in ("discord_id", "cf_handle", "state", "points", "finish_pos")}
+            sessions.setdefault(row['challenge_id'], dict(row, participants=[]))['participants'].append(participant)
+        return list(sessions.values())
+
+
+async def update_challenge_session_participant(challenge_id: int, discord_id: str, state: str, points: int = 0, finish_pos: int = None) -> None:
+    """Record a participant finishing or surrendering a running challenge."""
+    async def op(db):
+        await db.execute(
+            "UPDATE challenge_session_participants SET state = ?, points = ?, finish_pos = ? WHERE challenge_id = ? AND discord_id = ?",
+            (state, points, finish_pos, challenge_id, discord_id)
+        )
+
+    await _write_batcher.submit(op)
+
+
+async def end_challenge_session(challenge_id: int) -> None:
+    """Mark a challenge session as over so it is no longer restored on startup."""
+    async def op(db):
+        await db.execute(
+            "UPDATE challenge_sessions SET status = 'ENDED' WHERE challenge_id = ?",
+            (challenge_id,)
+        )
+
+    await _write_batcher.submit(op)
+
+
 async def create_contest(
     cf_contest_id: int, 
     name: str, 
@@ -155,8 +521,7 @@ async def create_contest(
     end_time: str
 ) -> int:
     """Create a new contest and return the contest_id."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _write_db() as db:
         cursor = await db.execute(
             "INSERT INTO contests (cf_contest_id, name, start_time, end_time) VALUES (?, ?, ?, ?)",
             (cf_contest_id, name, start_time, end_time)
@@ -172,8 +537,7 @@ async def update_contest_score(
     rank: int
 ) -> None:
     """Update or insert a contest score for a user."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _write_db() as db:
         await db.execute(
             "INSERT OR REPLACE INTO contest_scores (contest_id, user_id, score, rank) VALUES (?, ?, ?, ?)",
             (contest_id, user_id, score, rank)
@@ -187,8 +551,7 @@ async def add_score_history(
     score: int
 ) -> None:
     """Add an entry to score history."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _write_db() as db:
         await db.execute(
             "INSERT INTO score_history (user_id, score_type, score) VALUES (?, ?, ?)",
             (user_id, score_type, score)
@@ -198,26 +561,17 @@ async def add_score_history(
 
 async def get_leaderboard(limit: int = 10) -> List[Dict]:
     """Get leaderboard based on total scores from challenges and contests."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute("""
             SELECT 
                 u.user_id,
                 u.discord_id,
                 u.cf_handle,
-                COALESCE(challenge_scores.total_challenge_score, 0) + COALESCE(contest_scores.total_contest_score, 0) as total_score
-            FROM users u
-            LEFT JOIN (
-                SELECT user_id, SUM(score_awarded) as total_challenge_score
-                FROM challenge_participants
-                GROUP BY user_id
-            ) challenge_scores ON u.user_id = challenge_scores.user_id
-            LEFT JOIN (
-                SELECT user_id, SUM(score) as total_contest_score
-                FROM contest_participants
-                GROUP BY user_id
-            ) contest_scores ON u.user_id = contest_scores.user_id
-            ORDER BY total_score DESC
+                a.total_score
+            FROM score_aggregates a
+            JOIN users u ON u.user_id = a.user_id
+            WHERE a.period = 'all' AND a.bucket = 'all'
+            ORDER BY a.total_score DESC
             LIMIT ?
         """, (limit,))
         rows = await cursor.fetchall()
@@ -232,30 +586,36 @@ async def delete_user(discord_id: str = None, cf_handle: str = None) -> bool:
     if not discord_id and not cf_handle:
         raise ValueError("Either discord_id or cf_handle must be provided")
     
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
+    async with _write_db() as db:
         if discord_id:
+            await db.execute(
+                "DELETE FROM score_aggregates WHERE user_id IN (SELECT user_id FROM users WHERE discord_id = ?)",
+                (discord_id,)
+            )
             cursor = await db.execute(
                 "DELETE FROM users WHERE discord_id = ?",
                 (discord_id,)
             )
         else:
+            await db.execute(
+                "DELETE FROM score_aggregates WHERE user_id IN (SELECT user_id FROM users WHERE cf_handle = ?)",
+                (cf_handle,)
+            )
             cursor = await db.execute(
                 "DELETE FROM users WHERE cf_handle = ?",
                 (cf_handle,)
             )
         
         await db.commit()
+        _identity_cache.invalidate(discord_id=discord_id, cf_handle=cf_handle)
+        leaderboard_cache.invalidate()
         return cursor.rowcount > 0
 
 
 # Bot contest functions
 async def create_bot_contest(name: str, duration: int, start_time: str, unix_timestamp: int = None, guild_id: int = None) -> int:
     """Create a new bot contest and return the contest_id."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
+    async with _write_db() as db:
         if unix_timestamp is None and start_time:
             try:
                 start_time_dt = datetime.fromisoformat(start_time)
@@ -273,8 +633,7 @@ async def create_bot_contest(name: str, duration: int, start_time: str, unix_tim
 
 async def get_bot_contest(contest_id: int) -> Optional[Dict]:
     """Get bot contest by ID."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute(
             "SELECT * FROM contests WHERE contest_id = ? AND contest_type = 'bot'",
             (contest_id,)
@@ -285,8 +644,7 @@ async def get_bot_contest(contest_id: int) -> Optional[Dict]:
 
 async def get_pending_and_active_contests() -> List[Dict]:
     """Get all bot contests that are not ended."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute(
             "SELECT * FROM contests WHERE status != 'ENDED' AND contest_type = 'bot'"
         )
@@ -294,90 +652,184 @@ async def get_pending_and_active_contests() -> List[Dict]:
         return [dict(row) for row in rows]
 
 
-async def update_contest_status(contest_id: int, status: str) -> None:
-    """Update contest status."""
-    async with aiosqlite.connect(DB_PATH) as db:
+async def update_contest_status(contest_id: int, status: str, started_at: int = None) -> None:
+    """Update contest status, optionally recording when it actually started."""
+    async with _write_db() as db:
+        if started_at is None:
+            await db.execute(
+                "UPDATE contests SET status = ? WHERE contest_id = ?",
+                (status, contest_id)
+            )
+        else:
+            await db.execute(
+                "UPDATE contests SET status = ?, started_at = ? WHERE contest_id = ?",
+                (status, started_at, contest_id)
+            )
+        await db.commit()
+
+
+async def set_contest_announcement(contest_id: int, channel_id: int, message_id: int) -> None:
+    """Store where a contest's announcement message was posted."""
+    async with _write_db() as db:
         await db.execute(
-            "UPDATE contests SET status = ? WHERE contest_id = ?",
-            (status, contest_id)
+            "UPDATE contests SET announcement_channel_id = ?, announcement_message_id = ? WHERE contest_id = ?",
+            (channel_id, message_id, contest_id)
         )
         await db.commit()
 
 
-async def update_contest_problems(contest_id: int, problems: List[str]) -> None:
-    """Update problems list for a contest."""
-    async with aiosqlite.connect(DB_PATH) as db:
+async def set_contest_scoreboard(contest_id: int, channel_id: int, message_id: int) -> None:
+    """Store where a running contest's live scoreboard message was posted."""
+    async with _write_db() as db:
         await db.execute(
-            "UPDATE contests SET problems = ? WHERE contest_id = ?",
-            (json.dumps(problems), contest_id)
+            "UPDATE contests SET scoreboard_channel_id = ?, scoreboard_message_id = ? WHERE contest_id = ?",
+            (channel_id, message_id, contest_id)
+        )
+        await db.commit()
+
+
+async def update_contest_problems(contest_id: int, problems: List[str]) -> None:
+    """Replace the problem list of a contest."""
+    async with _write_db() as db:
+        await db.execute("DELETE FROM contest_problems WHERE contest_id = ?", (contest_id,))
+        rows = []
+        for position, link in enumerate(problems):
+            parsed = parse_problem_link(link)
+            rows.append((contest_id, position, link, parsed[0] if parsed else None, parsed[1] if parsed else None))
+        await db.executemany(
+            "INSERT INTO contest_problems (contest_id, position, link, cf_contest_id, problem_index) VALUES (?, ?, ?, ?, ?)",
+            rows
         )
         await db.commit()
 
 
 async def get_contest_problems(contest_id: int) -> List[str]:
-    """Get problems list for a contest."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    """Get problem links for a contest, in order."""
+    async with _read_db() as db:
         cursor = await db.execute(
-            "SELECT problems FROM contests WHERE contest_id = ?",
+            "SELECT link FROM contest_problems WHERE contest_id = ? ORDER BY position",
             (contest_id,)
         )
-        row = await cursor.fetchone()
-        if row and row[0]:
-            return json.loads(row[0])
-        return []
+        rows = await cursor.fetchall()
+        return [row['link'] for row in rows]
 
 
-async def update_contest_solves_info(contest_id: int, solves_info: Dict) -> None:
-    """Update solves info for a contest."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            "UPDATE contests SET solves_info = ? WHERE contest_id = ?",
-            (json.dumps(solves_info), contest_id)
+async def get_contest_problem_rows(contest_id: int) -> List[Dict]:
+    """Get a contest's problems with their parsed Codeforces contest ID and index."""
+    async with _read_db() as db:
+        cursor = await db.execute(
+            "SELECT position, link, cf_contest_id, problem_index FROM contest_problems WHERE contest_id = ? ORDER BY position",
+            (contest_id,)
         )
-        await db.commit()
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
 
 
-async def get_contest_solves_info(contest_id: int) -> Dict:
-    """Get solves info for a contest."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+async def get_contest_solves(contest_id: int) -> List[Dict]:
+    """Get every solve of a contest as rows of position, discord_id, points, solved_at, wrong_attempts and is_first."""
+    async with _read_db() as db:
         cursor = await db.execute(
-            "SELECT solves_info FROM contests WHERE contest_id = ?",
+            """SELECT cs.position, u.discord_id, cs.points, cs.solved_at, cs.wrong_attempts, cs.is_first
+               FROM contest_solves cs
+               JOIN users u ON u.user_id = cs.user_id
+               WHERE cs.contest_id = ?
+               ORDER BY cs.solved_at""",
             (contest_id,)
         )
-        row = await cursor.fetchone()
-        if row and row[0]:
-            return json.loads(row[0])
-        return {}
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+
+async def get_contest_solved_positions(contest_id: int) -> Dict[str, Set[int]]:
+    """Get the solved problem positions of every participant as {discord_id: positions}."""
+    async with _read_db() as db:
+        cursor = await db.execute(
+            """SELECT u.discord_id, cs.position
+               FROM contest_solves cs
+               JOIN users u ON cs.user_id = u.user_id
+               WHERE cs.contest_id = ?""",
+            (contest_id,)
+        )
+        solved: Dict[str, Set[int]] = {}
+        for row in await cursor.fetchall():
+            solved.setdefault(row['discord_id'], set()).add(row['position'])
+        return solved
+
+
+async def record_contest_solve(contest_id: int, position: int, discord_id: str, points: int, first_solve_bonus: int = 0, solved_at: int = None, wrong_attempts: int = 0) -> Optional[Dict]:
+    """
+    Atomically record a participant's solve and add its points to their score.
+    The first solver of a problem also gets `first_solve_bonus`. `wrong_attempts`
+    counts the rejected submissions before the accepted one (ICPC penalty).
+    Returns {"points", "is_first_solve"}, or None if the user isn't a participant
+    or already has this solve.
+    """
+    user_id = await _get_user_id(discord_id)
+    if user_id is None:
+        return None
+
+    async def op(db):
+        cursor = await db.execute(
+            "SELECT joined_at FROM contest_participants WHERE contest_id = ? AND user_id = ?",
+            (contest_id, user_id)
+        )
+        participant = await cursor.fetchone()
+        if not participant:
+            return None
+
+        # Claim the first solve; the partial unique index lets only one row per problem have is_first = 1
+        awarded = points + first_solve_bonus
+        cursor = await db.execute(
+            """INSERT INTO contest_solves (contest_id, position, user_id, points, solved_at, wrong_attempts, is_first)
+               VALUES (?, ?, ?, ?, ?, ?, 1) ON CONFLICT DO NOTHING""",
+            (contest_id, position, user_id, awarded, solved_at, wrong_attempts)
+        )
+        is_first_solve = cursor.rowcount == 1
+        if not is_first_solve:
+            awarded = points
+            cursor = await db.execute(
+                """INSERT INTO contest_solves (contest_id, position, user_id, points, solved_at, wrong_attempts, is_first)
+                   VALUES (?, ?, ?, ?, ?, ?, 0) ON CONFLICT DO NOTHING""",
+                (contest_id, position, user_id, awarded, solved_at, wrong_attempts)
+            )
+            if cursor.rowcount != 1:
+                return None  # already solved by this user
+
+        await db.execute(
+            "UPDATE contest_participants SET score = score + ? WHERE contest_id = ? AND user_id = ?",
+            (awarded, contest_id, user_id)
+        )
+        await _add_to_score_aggregates(db, user_id, contest_points=awarded, earned_at=participant['joined_at'])
+        return {"points": awarded, "is_first_solve": is_first_solve}
+
+    award = await _write_batcher.submit(op)
+    if award:
+        leaderboard_cache.invalidate()
+    return award
 
 
 async def join_contest(contest_id: int, discord_id: str, codeforces_handle: str) -> None:
     """Add user to contest participants."""
-    user_data = await get_user_by_discord(discord_id)
-    if not user_data:
+    user_id = await _get_user_id(discord_id)
+    if user_id is None:
         raise ValueError(f"User with discord_id {discord_id} not found")
     
-    user_id = user_data['user_id']
-    
-    async with aiosqlite.connect(DB_PATH) as db:
+    async def op(db):
         await db.execute(
             "INSERT OR IGNORE INTO contest_participants (contest_id, user_id) VALUES (?, ?)",
             (contest_id, user_id)
         )
-        await db.commit()
+
+    await _write_batcher.submit(op)
 
 
 async def get_contest_participant(contest_id: int, discord_id: str) -> Optional[Dict]:
     """Get contest participant data."""
-    user_data = await get_user_by_discord(discord_id)
-    if not user_data:
+    user_id = await _get_user_id(discord_id)
+    if user_id is None:
         return None
     
-    user_id = user_data['user_id']
-    
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute(
             """SELECT cp.*, u.cf_handle as codeforces_handle 
                FROM contest_participants cp 
@@ -389,32 +841,25 @@ async def get_contest_participant(contest_id: int, discord_id: str) -> Optional[
         return dict(row) if row else None
 
 
-async def update_contest_participant_score(contest_id: int, discord_id: str, score_increase: int, solved_problems: List[str]) -> None:
-    """Update participant's score and solved problems."""
-    user_data = await get_user_by_discord(discord_id)
-    if not user_data:
-        raise ValueError(f"User with discord_id {discord_id} not found")
-    
-    user_id = user_data['user_id']
-    
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            "UPDATE contest_participants SET score = score + ?, solved_problems = ? WHERE contest_id = ? AND user_id = ?",
-            (score_increase, json.dumps(solved_problems), contest_id, user_id)
-        )
-        await db.commit()
-
-
 async def get_contest_leaderboard(contest_id: int) -> List[Dict]:
-    """Get contest leaderboard ordered by score."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    """
+    Get contest standings ICPC style: most problems solved first, then least
+    penalty (minutes from the start to each solve plus PENALTY_PER_WRONG_ATTEMPT
+    per rejected attempt before it), then score.
+    """
+    async with _read_db() as db:
         cursor = await db.execute(
-            """SELECT cp.*, u.discord_id, u.cf_handle as codeforces_handle 
+            f"""SELECT cp.*, u.discord_id, u.cf_handle as codeforces_handle,
+                      COUNT(cs.position) AS solved_count,
+                      COALESCE(SUM(COALESCE((cs.solved_at - c.started_at) / 60, 0)
+                                   + {PENALTY_PER_WRONG_ATTEMPT} * cs.wrong_attempts), 0) AS penalty
                FROM contest_participants cp 
                JOIN users u ON cp.user_id = u.user_id 
+               JOIN contests c ON c.contest_id = cp.contest_id
+               LEFT JOIN contest_solves cs ON cs.contest_id = cp.contest_id AND cs.user_id = cp.user_id
                WHERE cp.contest_id = ? 
-               ORDER BY cp.score DESC""",
+               GROUP BY cp.contest_id, cp.user_id
+               ORDER BY solved_count DESC, penalty ASC, cp.score DESC""",
             (contest_id,)
         )
         rows = await cursor.fetchall()
@@ -423,8 +868,7 @@ async def get_contest_leaderboard(contest_id: int) -> List[Dict]:
 
 async def get_contest_participant_count(contest_id: int) -> int:
     """Get the number of participants in a contest."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute(
             "SELECT COUNT(*) as count FROM contest_participants WHERE contest_id = ?",
             (contest_id,)
@@ -435,8 +879,7 @@ async def get_contest_participant_count(contest_id: int) -> int:
 
 async def get_all_bot_contests() -> List[Dict]:
     """Get all bot contests ordered by start time (newest first)."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute(
             "SELECT * FROM contests WHERE contest_type = 'bot' ORDER BY start_time DESC"
         )
@@ -447,31 +890,54 @@ async def get_all_bot_contests() -> List[Dict]:
 # Functions for Codeforces functionality
 async def get_cf_handle(discord_id: str) -> Optional[str]:
     """Get Codeforces handle for a Discord user."""
-    user = await get_user_by_discord(discord_id)
-    return user['cf_handle'] if user else None
+    return (await get_cf_handles([discord_id])).get(str(discord_id))
 
 
 async def get_all_cf_handles() -> Dict[str, str]:
     """Get all Discord ID to Codeforces handle mappings."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute("SELECT discord_id, cf_handle FROM users")
         rows = await cursor.fetchall()
         return {row['discord_id']: row['cf_handle'] for row in rows}
 
 
-async def increment_user_problems_solved(discord_id: str):
-    """Increment the user's bot problems solved count by 1"""
+async def increment_user_problems_solved(discord_id: str, cf_contest_id: int = None, problem_index: str = None, solved_before: int = None):
+    """
+    Increment the user's problems solved count by 1. When the problem is
+    given it is only counted once: for handles the solved-problems sync has
+    covered, the problem's bit is set in their bitmap; otherwise the stored
+    submissions are checked for an earlier accepted solution before
+    `solved_before`.
+    """
     try:
         current_timestamp = int(datetime.now().timestamp())
         
         # Increment the problems_solved counter by 1
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute(
-                "UPDATE users SET problems_solved = problems_solved + 1, last_updated = ? WHERE discord_id = ?",
-                (current_timestamp, discord_id)
-            )
-            await db.commit()
+        async def op(db):
+            newly_solved = True
+            if cf_contest_id is not None and problem_index is not None:
+                newly_solved = await _mark_problem_solved(db, discord_id, cf_contest_id, problem_index)
+                if newly_solved is False:
+                    return None
+
+            if newly_solved:
+                cursor = await db.execute(
+                    "UPDATE users SET problems_solved = problems_solved + 1, last_updated = ? WHERE discord_id = ?",
+                    (current_timestamp, discord_id)
+                )
+            else:
+                # Handle not synced yet; fall back to the stored submissions
+                cursor = await db.execute(
+                    """UPDATE users SET problems_solved = problems_solved + 1, last_updated = ?
+                       WHERE discord_id = ? AND NOT EXISTS (
+                           SELECT 1 FROM cf_submissions s
+                           WHERE s.handle = LOWER(users.cf_handle) AND s.cf_contest_id = ? AND s.problem_index = ?
+                             AND s.verdict = 'OK' AND s.created_at < ?
+                       )""",
+                    (current_timestamp, discord_id, cf_contest_id, problem_index, solved_before or current_timestamp)
+                )
+            if cursor.rowcount == 0:
+                return None
             
             # Get the updated count for logging
             cursor = await db.execute(
@@ -479,9 +945,13 @@ async def increment_user_problems_solved(discord_id: str):
                 (discord_id,)
             )
             row = await cursor.fetchone()
-            new_count = row[0] if row else 0
-            
-            print(f"Incremented bot problems solved count for user {discord_id}: now {new_count} problems")
+            return row[0] if row else 0
+
+        new_count = await _write_batcher.submit(op)
+        if new_count is None:
+            return
+        leaderboard_cache.invalidate()
+        print(f"Incremented bot problems solved count for user {discord_id}: now {new_count} problems")
             
     except Exception as e:
         print(f"Error incrementing problems solved count for user {discord_id}: {e}")
@@ -514,54 +984,15 @@ async def get_user_score(discord_id: str) -> Dict:
     
     user_id = user['user_id']
     
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
-        # --- Overall Score ---
-        cursor = await db.execute(
-            "SELECT COALESCE(SUM(score), 0) as contest_score FROM contest_participants WHERE user_id = ?",
-            (user_id,)
-        )
-        contest_row = await cursor.fetchone()
-        contest_score = contest_row['contest_score'] if contest_row else 0
-        
-        cursor = await db.execute(
-            "SELECT COALESCE(SUM(score_awarded), 0) as challenge_score FROM challenge_participants WHERE user_id = ?",
-            (user_id,)
-        )
-        challenge_row = await cursor.fetchone()
-        challenge_score = challenge_row['challenge_score'] if challenge_row else 0
-        
-        total_score = contest_score + challenge_score
-
-        # --- Time-based Scores ---
-        now = datetime.now()
-        time_thresholds = {
-            "daily": (now - timedelta(days=1)).isoformat(),
-            "weekly": (now - timedelta(days=7)).isoformat(),
-            "monthly": (now - timedelta(days=30)).isoformat()
-        }
-
+    async with _read_db() as db:
         scores = {}
-        for period, threshold in time_thresholds.items():
-            # Contest score for the period
+        for category, period in LEADERBOARD_PERIODS.items():
             cursor = await db.execute(
-                "SELECT COALESCE(SUM(score), 0) as score FROM contest_participants WHERE user_id = ? AND joined_at >= ?",
-                (user_id, threshold)
+                f"SELECT total_score FROM score_aggregates WHERE period = ? AND bucket = {score_bucket_sql(period)} AND user_id = ?",
+                (period, user_id)
             )
-            contest_period_score = (await cursor.fetchone())['score']
-
-            # Challenge score for the period
-            cursor = await db.execute(
-                """SELECT COALESCE(SUM(chp.score_awarded), 0) as score
-                   FROM challenge_participants chp
-                   JOIN challenges ch ON chp.challenge_id = ch.challenge_id
-                   WHERE chp.user_id = ? AND ch.created_at >= ?""",
-                (user_id, threshold)
-            )
-            challenge_period_score = (await cursor.fetchone())['score']
-            
-            scores[f"{period}_points"] = contest_period_score + challenge_period_score
+            row = await cursor.fetchone()
+            scores[f"{category}_points"] = row['total_score'] if row else 0
 
         return {
             "exists": True,
@@ -569,7 +1000,7 @@ async def get_user_score(discord_id: str) -> Dict:
             "daily_points": scores["daily_points"],
             "weekly_points": scores["weekly_points"],
             "monthly_points": scores["monthly_points"],
-            "overall_points": total_score,
+            "overall_points": scores["overall_points"],
             "solved_problems": user['problems_solved'] or 0,
             "last_updated": user['last_updated'] or 0
         }
@@ -577,9 +1008,7 @@ async def get_user_score(discord_id: str) -> Dict:
 
 async def get_custom_leaderboard(category: str, limit: int = 10) -> List[Dict]:
     """Get leaderboard for different scoring categories."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        
+    async with _read_db() as db:
         if category == "solved":
             # Problems solved leaderboard
             cursor = await db.execute("""
@@ -593,70 +1022,23 @@ async def get_custom_leaderboard(category: str, limit: int = 10) -> List[Dict]:
                 ORDER BY problems_solved DESC 
                 LIMIT ?
             """, (limit,))
-        elif category in ["daily", "weekly", "monthly"]:
-            # Time-based scoring from contests and challenges
-            now = datetime.now()
-            if category == "daily":
-                time_threshold = now - timedelta(days=1)
-            elif category == "weekly":
-                time_threshold = now - timedelta(days=7)
-            else:  # monthly
-                time_threshold = now - timedelta(days=30)
-            
-            time_threshold_str = time_threshold.isoformat()
-            
+        else:
+            # Daily/weekly/monthly/overall totals from the materialized aggregates
+            period = LEADERBOARD_PERIODS.get(category, "all")
             cursor = await db.execute(f"""
                 SELECT 
                     u.discord_id,
                     u.cf_handle as codeforces_name,
-                    COALESCE(recent_contest_scores.score, 0) + COALESCE(recent_challenge_scores.score, 0) as score,
-                    ROW_NUMBER() OVER (ORDER BY (COALESCE(recent_contest_scores.score, 0) + COALESCE(recent_challenge_scores.score, 0)) DESC) as rank
-                FROM users u
-                LEFT JOIN (
-                    SELECT cp.user_id, SUM(cp.score) as score
-                    FROM contest_participants cp
-                    WHERE cp.joined_at >= ?
-                    GROUP BY cp.user_id
-                ) recent_contest_scores ON u.user_id = recent_contest_scores.user_id
-                LEFT JOIN (
-                    SELECT chp.user_id, SUM(chp.score_awarded) as score
-                    FROM challenge_participants chp
-                    JOIN challenges ch ON chp.challenge_id = ch.challenge_id
-                    WHERE ch.created_at >= ?
-                    GROUP BY chp.user_id
-                ) recent_challenge_scores ON u.user_id = recent_challenge_scores.user_id
-                -- FIXED: Replaced HAVING with WHERE on the calculated score
-                WHERE (COALESCE(recent_contest_scores.score, 0) + COALESCE(recent_challenge_scores.score, 0)) > 0
-                ORDER BY score DESC 
+                    a.total_score as score
+                FROM score_aggregates a
+                JOIN users u ON u.user_id = a.user_id
+                WHERE a.period = ? AND a.bucket = {score_bucket_sql(period)} AND a.total_score > 0
+                ORDER BY a.total_score DESC 
                 LIMIT ?
-            """, (time_threshold_str, time_threshold_str, limit))
-        else: # "overall"
-            # Overall scoring
-            cursor = await db.execute("""
-                SELECT 
-                    u.discord_id,
-                    u.cf_handle as codeforces_name,
-                    COALESCE(contest_scores.score, 0) + COALESCE(challenge_scores.score, 0) as score,
-                    ROW_NUMBER() OVER (ORDER BY (COALESCE(contest_scores.score, 0) + COALESCE(challenge_scores.score, 0)) DESC) as rank
-                FROM users u
-                LEFT JOIN (
-                    SELECT user_id, SUM(score) as score
-                    FROM contest_participants
-                    GROUP BY user_id
-                ) contest_scores ON u.user_id = contest_scores.user_id
-                LEFT JOIN (
-                    SELECT user_id, SUM(score_awarded) as score
-                    FROM challenge_participants
-                    GROUP BY user_id
-                ) challenge_scores ON u.user_id = challenge_scores.user_id
-                -- FIXED: Replaced HAVING with WHERE on the calculated score
-                WHERE (COALESCE(contest_scores.score, 0) + COALESCE(challenge_scores.score, 0)) > 0
-                ORDER BY score DESC 
-                LIMIT ?
-            """, (limit,))
+            """, (period, limit))
         
         rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return [dict(row, rank=rank) for rank, row in enumerate(rows, 1)]
 
 
 async def sync_cf_handles_from_file(cf_links_file: str) -> None:
@@ -667,7 +1049,7 @@ async def sync_cf_handles_from_file(cf_links_file: str) -> None:
     with open(cf_links_file, 'r') as f:
         links = json.load(f)
     
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _write_db() as db:
         for discord_id, cf_handle in links.items():
             cursor = await db.execute("SELECT discord_id FROM users WHERE discord_id = ?", (discord_id,))
             user = await cursor.fetchone()
@@ -684,6 +1066,8 @@ async def sync_cf_handles_from_file(cf_links_file: str) -> None:
                 )
         
         await db.commit()
+        _identity_cache.clear()
+        leaderboard_cache.invalidate()
 
 
 async def add_challenge_history(challenge_id: int, discord_id: str, cf_handle: str, 
@@ -691,16 +1075,14 @@ async def add_challenge_history(challenge_id: int, discord_id: str, cf_handle: s
                                 rank: int, points: int) -> None:
     """Add an entry to challenge participants (replaces challenge_history)."""
     # Get or create user
-    user = await get_user_by_discord(discord_id)
-    if not user:
+    user_id = await _get_user_id(discord_id)
+    if user_id is None:
         # Create user if doesn't exist
         user_id = await add_user(discord_id, cf_handle)
-    else:
-        user_id = user['user_id']
     
     # Update challenge info if provided
     if problem_name or problem_link:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with _write_db() as db:
             await db.execute(
                 "UPDATE challenges SET problem_name = COALESCE(?, problem_name), problem_link = COALESCE(?, problem_link) WHERE challenge_id = ?",
                 (problem_name, problem_link, challenge_id)
@@ -713,8 +1095,7 @@ async def add_challenge_history(challenge_id: int, discord_id: str, cf_handle: s
 
 async def get_challenge_history(limit: int = 50) -> List[Dict]:
     """Get challenge history from challenge_participants joined with other tables."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute("""
             SELECT 
                 c.challenge_id,
@@ -738,12 +1119,11 @@ async def get_challenge_history(limit: int = 50) -> List[Dict]:
 
 async def get_user_challenge_history(discord_id: str, limit: int = 20) -> List[Dict]:
     """Get challenge history for a specific user."""
-    user = await get_user_by_discord(discord_id)
-    if not user:
+    user_id = await _get_user_id(discord_id)
+    if user_id is None:
         return []
     
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read_db() as db:
         cursor = await db.execute("""
             SELECT 
                 c.challenge_id,
@@ -758,15 +1138,13 @@ async def get_user_challenge_history(discord_id: str, limit: int = 20) -> List[D
             WHERE cp.user_id = ?
             ORDER BY cp.joined_at DESC
             LIMIT ?
-        """, (user['user_id'], limit))
+        """, (user_id, limit))
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
 async def get_challenge_details(challenge_id: int) -> Optional[Dict]:
     """Get all details for a specific challenge, including its participants."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-
+    async with _read_db() as db:
         # 1. Get main challenge info
         cursor = await db.execute(
             "SELECT * FROM challenges WHERE challenge_id = ?",
@@ -803,54 +1181,310 @@ async def get_challenge_details(challenge_id: int) -> Optional[Dict]:
 
 async def get_contest_custom_leaderboard(category: str, limit: int = 10) -> List[Dict]:
     """Get leaderboard based only on contest scores for different time categories."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-
-        if category in ["daily", "weekly", "monthly"]:
-            now = datetime.now()
-            if category == "daily":
-                time_threshold = now - timedelta(days=1)
-            elif category == "weekly":
-                time_threshold = now - timedelta(days=7)
-            else:  # monthly
-                time_threshold = now - timedelta(days=30)
-            
-            time_threshold_str = time_threshold.isoformat()
-            
-            cursor = await db.execute("""
-                SELECT
-                    u.discord_id,
-                    u.cf_handle as codeforces_name,
-                    total_scores.score as score,
-                    ROW_NUMBER() OVER (ORDER BY total_scores.score DESC) as rank
-                FROM (
-                    SELECT user_id, SUM(score) as score
-                    FROM contest_participants
-                    WHERE joined_at >= ?
-                    GROUP BY user_id
-                ) AS total_scores
-                JOIN users u ON u.user_id = total_scores.user_id
-                WHERE total_scores.score > 0
-                ORDER BY total_scores.score DESC
-                LIMIT ?
-            """, (time_threshold_str, limit))
-        else:  # Default to "overall"
-            cursor = await db.execute("""
-                SELECT
-                    u.discord_id,
-                    u.cf_handle as codeforces_name,
-                    total_scores.score as score,
-                    ROW_NUMBER() OVER (ORDER BY total_scores.score DESC) as rank
-                FROM (
-                    SELECT user_id, SUM(score) as score
-                    FROM contest_participants
-                    GROUP BY user_id
-                ) AS total_scores
-                JOIN users u ON u.user_id = total_scores.user_id
-                WHERE total_scores.score > 0
-                ORDER BY total_scores.score DESC
-                LIMIT ?
-            """, (limit,))
+    period = LEADERBOARD_PERIODS.get(category, "all")
+    async with _read_db() as db:
+        cursor = await db.execute(f"""
+            SELECT
+                u.discord_id,
+                u.cf_handle as codeforces_name,
+                a.contest_score as score
+            FROM score_aggregates a
+            JOIN users u ON u.user_id = a.user_id
+            WHERE a.period = ? AND a.bucket = {score_bucket_sql(period)} AND a.contest_score > 0
+            ORDER BY a.contest_score DESC
+            LIMIT ?
+        """, (period, limit))
         
+        rows = await cursor.fetchall()
+        return [dict(row, rank=rank) for rank, row in enumerate(rows, 1)]
+
+
+# Codeforces submission store functions
+def _submission_row(handle: str, submission: Dict) -> Tuple:
+    problem = submission.get('problem', {})
+    return (
+        handle.lower(), submission['id'], problem.get('contestId'), problem.get('index'),
+        problem.get('name'), problem.get('rating'), submission.get('verdict'),
+        submission.get('creationTimeSeconds', 0)
+    )
+
+
+def _submission_from_row(row) -> Dict:
+    """Rebuild the fields of an API submission object that the bot reads."""
+    problem = {"contestId": row['cf_contest_id'], "index": row['problem_index'], "name": row['problem_name']}
+    if row['problem_rating'] is not None:
+        problem["rating"] = row['problem_rating']
+    return {
+        "id": row['submission_id'],
+        "contestId": row['cf_contest_id'],
+        "creationTimeSeconds": row['created_at'],
+        "verdict": row['verdict'],
+        "problem": problem,
+    }
+
+
+async def get_submission_cursor(handle: str) -> int:
+    """Highest submission ID up to which a handle's submissions are stored (0 if never fetched)."""
+    async with _read_db() as db:
+        cursor = await db.execute(
+            "SELECT last_submission_id FROM cf_submission_cursors WHERE handle = ?",
+            (handle.lower(),)
+        )
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+
+async def store_submissions(submissions: List[Dict], handle: str, last_submission_id: Optional[int] = None) -> None:
+    """
+    Upsert a handle's API submission objects into cf_submissions. When
+    `last_submission_id` is given, the handle's cursor moves to it in the
+    same transaction.
+    """
+    rows = [_submission_row(handle, submission) for submission in submissions]
+
+    async with _write_db() as db:
+        await db.executemany(
+            """INSERT OR REPLACE INTO cf_submissions
+               (handle, submission_id, cf_contest_id, problem_index, problem_name, problem_rating, verdict, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows
+        )
+        if last_submission_id is not None:
+            await db.execute(
+                """INSERT INTO cf_submission_cursors (handle, last_submission_id, refreshed_at) VALUES (?, ?, ?)
+                   ON CONFLICT(handle) DO UPDATE SET
+                       last_submission_id = MAX(last_submission_id, excluded.last_submission_id),
+                       refreshed_at = excluded.refreshed_at""",
+                (handle.lower(), last_submission_id, int(datetime.now().timestamp()))
+            )
+        await db.commit()
+
+
+async def get_handle_submissions(handle: str, cf_contest_id: int, problem_index: Optional[str] = None) -> List[Dict]:
+    """Get a handle's stored submissions in a contest (optionally one problem), newest first."""
+    query = "SELECT * FROM cf_submissions WHERE handle = ? AND cf_contest_id = ?"
+    params: List[Any] = [handle.lower(), cf_contest_id]
+    if problem_index is not None:
+        query += " AND problem_index = ?"
+        params.append(problem_index)
+    async with _read_db() as db:
+        cursor = await db.execute(query + " ORDER BY created_at DESC, submission_id DESC", params)
+        return [_submission_from_row(row) for row in await cursor.fetchall()]
+
+
+async def find_accepted_submission(handle: str, cf_contest_id: int, problem_index: str, since_ts: int = 0) -> Optional[Dict]:
+    """Get a handle's first stored accepted submission to a problem made at or after `since_ts`."""
+    async with _read_db() as db:
+        cursor = await db.execute(
+            """SELECT * FROM cf_submissions
+               WHERE handle = ? AND cf_contest_id = ? AND problem_index = ? AND created_at >= ? AND verdict = 'OK'
+               ORDER BY created_at, submission_id
+               LIMIT 1""",
+            (handle.lower(), cf_contest_id, problem_index, since_ts)
+        )
+        row = await cursor.fetchone()
+        return _submission_from_row(row) if row else None
+
+
+# Solved-problem bitmaps, kept in sync with the submission store
+def _bitmap_from_blob(blob: Optional[bytes]) -> int:
+    return int.from_bytes(blob or b"", "little")
+
+
+def _bitmap_to_blob(bitmap: int) -> bytes:
+    return bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+
+
+async def _mark_problem_solved(db, discord_id: str, cf_contest_id: int, problem_index: str) -> Optional[bool]:
+    """
+    Set a problem's bit in the user's solved bitmap. Returns True if it was
+    newly set, False if it already was, or None if the user's handle has not
+    been through sync_solved_problems() yet.
+    """
+    cursor = await db.execute(
+        """SELECT sp.handle, sp.bitmap FROM users u
+           JOIN cf_solved_problems sp ON sp.handle = LOWER(u.cf_handle)
+           WHERE u.discord_id = ?""",
+        (discord_id,)
+    )
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+
+    await db.execute(
+        "INSERT OR IGNORE INTO cf_problem_ids (cf_contest_id, problem_index) VALUES (?, ?)",
+        (cf_contest_id, problem_index)
+    )
+    cursor = await db.execute(
+        "SELECT problem_id FROM cf_problem_ids WHERE cf_contest_id = ? AND problem_index = ?",
+        (cf_contest_id, problem_index)
+    )
+    bit = 1 << (await cursor.fetchone())[0]
+    bitmap = _bitmap_from_blob(row['bitmap'])
+    if bitmap & bit:
+        return False
+    await db.execute(
+        "UPDATE cf_solved_problems SET bitmap = ?, solved_count = solved_count + 1 WHERE handle = ?",
+        (_bitmap_to_blob(bitmap | bit), row['handle'])
+    )
+    return True
+
+
+async def get_submission_cursors() -> Dict[str, Dict]:
+    """Get every stored handle's submission cursor: handle -> {last_submission_id, refreshed_at}."""
+    async with _read_db() as db:
+        cursor = await db.execute("SELECT * FROM cf_submission_cursors")
+        return {row['handle']: dict(row) for row in await cursor.fetchall()}
+
+
+async def sync_solved_problems(handle: str) -> Optional[int]:
+    """
+    Fold a handle's accepted submissions stored since its last sync into its
+    solved-problem bitmap and set problems_solved of the users linked to it
+    to the distinct count. Returns the count, or None if the handle had no
+    new submissions or was never fetched.
+    """
+    handle = handle.lower()
+    async with _write_db() as db:
+        cursor = await db.execute(
+            "SELECT last_submission_id FROM cf_submission_cursors WHERE handle = ?",
+            (handle,)
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return None  # never fetched; don't reset problems_solved to an empty bitmap
+        last_id = row[0]
+
+        cursor = await db.execute(
+            "SELECT bitmap, solved_count, synced_submission_id FROM cf_solved_problems WHERE handle = ?",
+            (handle,)
+        )
+        state = await cursor.fetchone()
+        synced_id = state['synced_submission_id'] if state else 0
+        if state is not None and synced_id >= last_id:
+            return None
+
+        # Only final verdicts at or below the cursor; anything newer is folded in on a later sync
+        new_solves = """FROM cf_submissions
+                        WHERE handle = ? AND submission_id > ? AND submission_id <= ?
+                          AND verdict = 'OK' AND cf_contest_id IS NOT NULL"""
+        params = (handle, synced_id, last_id)
+        await db.execute(
+            f"INSERT OR IGNORE INTO cf_problem_ids (cf_contest_id, problem_index) SELECT DISTINCT cf_contest_id, problem_index {new_solves}",
+            params
+        )
+        cursor = await db.execute(
+            f"""SELECT DISTINCT p.problem_id FROM cf_problem_ids p
+                JOIN (SELECT cf_contest_id, problem_index {new_solves}) s
+                  ON s.cf_contest_id = p.cf_contest_id AND s.problem_index = p.problem_index""",
+            params
+        )
+        bitmap = _bitmap_from_blob(state['bitmap'] if state else None)
+        solved_count = state['solved_count'] if state else 0
+        for (problem_id,) in await cursor.fetchall():
+            bit = 1 << problem_id
+            if not bitmap & bit:
+                bitmap |= bit
+                solved_count += 1
+
+        await db.execute(
+            """INSERT OR REPLACE INTO cf_solved_problems (handle, bitmap, solved_count, synced_submission_id)
+               VALUES (?, ?, ?, ?)""",
+            (handle, _bitmap_to_blob(bitmap), solved_count, last_id)
+        )
+        cursor = await db.execute(
+            "UPDATE users SET problems_solved = ?, last_updated = ? WHERE LOWER(cf_handle) = ? AND problems_solved IS NOT ?",
+            (solved_count, int(datetime.now().timestamp()), handle, solved_count)
+        )
+        changed = cursor.rowcount > 0
+        await db.commit()
+
+    if changed:
+        leaderboard_cache.invalidate()
+    return solved_count
+
+
+# Broadcast (bulk DM) functions
+async def create_broadcast(guild_id: int, author_id: int, message: str, recipient_ids: List[int]) -> int:
+    """Create a broadcast with every recipient PENDING and return its broadcast_id."""
+    async with _write_db() as db:
+        cursor = await db.execute(
+            "INSERT INTO broadcasts (guild_id, author_id, message) VALUES (?, ?, ?)",
+            (guild_id, author_id, message)
+        )
+        broadcast_id = cursor.lastrowid
+        await db.executemany(
+            "INSERT OR IGNORE INTO broadcast_recipients (broadcast_id, discord_id) VALUES (?, ?)",
+            [(broadcast_id, discord_id) for discord_id in recipient_ids]
+        )
+        await db.commit()
+        return broadcast_id
+
+
+async def get_broadcast(broadcast_id: int) -> Optional[Dict]:
+    """Get a broadcast by ID."""
+    async with _read_db() as db:
+        cursor = await db.execute("SELECT * FROM broadcasts WHERE broadcast_id = ?", (broadcast_id,))
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+
+async def get_unfinished_broadcasts() -> List[Dict]:
+    """Get broadcasts that were still sending when the bot last stopped."""
+    async with _read_db() as db:
+        cursor = await db.execute("SELECT * FROM broadcasts WHERE status = 'RUNNING' ORDER BY broadcast_id")
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
+
+
+async def get_pending_broadcast_recipients(broadcast_id: int) -> List[int]:
+    """Get the discord IDs a broadcast has not attempted yet."""
+    async with _read_db() as db:
+        cursor = await db.execute(
+            "SELECT discord_id FROM broadcast_recipients WHERE broadcast_id = ? AND status = 'PENDING'",
+            (broadcast_id,)
+        )
+        return [row[0] for row in await cursor.fetchall()]
+
+
+async def set_broadcast_recipient_status(broadcast_id: int, discord_id: int, status: str, error: str = None) -> None:
+    """Record the delivery result for one recipient."""
+    async def op(db):
+        await db.execute(
+            "UPDATE broadcast_recipients SET status = ?, error = ? WHERE broadcast_id = ? AND discord_id = ?",
+            (status, error, broadcast_id, discord_id)
+        )
+
+    await _write_batcher.submit(op)
+
+
+async def finish_broadcast(broadcast_id: int) -> None:
+    """Mark a broadcast as done."""
+    async with _write_db() as db:
+        await db.execute(
+            "UPDATE broadcasts SET status = 'DONE', finished_at = CURRENT_TIMESTAMP WHERE broadcast_id = ?",
+            (broadcast_id,)
+        )
+        await db.commit()
+
+
+async def get_broadcast_summary(broadcast_id: int) -> Dict:
+    """Get recipient counts per status and the list of failed deliveries."""
+    async with _read_db() as db:
+        cursor = await db.execute(
+            "SELECT status, COUNT(*) FROM broadcast_recipients WHERE broadcast_id = ? GROUP BY status",
+            (broadcast_id,)
+        )
+        counts = {row[0]: row[1] for row in await cursor.fetchall()}
+        cursor = await db.execute(
+            "SELECT discord_id, error FROM broadcast_recipients WHERE broadcast_id = ? AND status = 'FAILED'",
+            (broadcast_id,)
+        )
+        failures = [dict(row) for row in await cursor.fetchall()]
+        return {
+            "total": sum(counts.values()),
+            "sent": counts.get('SENT', 0),
+            "failed": counts.get('FAILED', 0),
+            "pending": counts.get('PENDING', 0),
+            "failures": failures
+        }
@@ -0,0 +1,98 @@
+import asyncio
+import aiosqlite
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from utility.db_pragmas import apply_connection_pragmas
+
+
+class ConnectionPool:
+    """
+    Long-lived aiosqlite connections for a single database file.
+
+    Holds one writer connection guarded by a lock (SQLite only allows one
+    writer at a time anyway) and a fixed set of reader connections handed
+    out through a queue. Opening a connection spawns a worker thread and
+    re-opens the file, so keeping them alive removes that cost from every
+    helper call.
+    """
+
+    def __init__(self, db_path: str, readers: int = 4, pragmas: Optional[Dict] = None):
+        self.db_path = db_path
+        self.reader_count = max(1, readers)
+        self.pragmas = pragmas
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._closed = True
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path)
+        db.row_factory = aiosqlite.Row
+        if self.pragmas:
+            await apply_connection_pragmas(db, self.pragmas)
+        return db
+
+    async def open(self) -> None:
+        """Open the writer and reader connections."""
+        if not self._closed:
+            return
+        self._writer = await self._connect()
+        for _ in range(self.reader_count):
+            db = await self._connect()
+            self._readers.append(db)
+            self._idle_readers.put_nowait(db)
+        self._closed = False
+
+    async def close(self) -> None:
+        """Close every connection owned by the pool."""
+        if self._closed:
+            return
+        self._closed = True
+        async with self._write_lock:
+            if self._writer is not None:
+                await self._optimize(self._writer)
+                await self._writer.close()
+                self._writer = None
+        for db in self._readers:
+            await self._optimize(db)
+            await db.close()
+        self._readers.clear()
+        self._idle_readers = asyncio.Queue()
+
+    @staticmethod
+    async def _optimize(db: aiosqlite.Connection) -> None:
+        # Refresh planner statistics for tables this connection queried heavily
+        try:
+            await db.execute("PRAGMA optimize")
+        except Exception as e:
+            print(f"PRAGMA optimize failed: {e}")
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @asynccontextmanager
+    async def reader(self):
+        """Borrow a reader connection for the duration of the block."""
+        db = await self._idle_readers.get()
+        try:
+            yield db
+        finally:
+            self._idle_readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self):
+        """
+        Hold the writer connection exclusively for the duration of the block.
+        Anything left uncommitted when the block raises is rolled back so the
+        next holder starts from a clean transaction.
+        """
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                if self._writer is not None and self._writer.in_transaction:
+                    await self._writer.rollback()
+                raise
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import aiosqlite
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+# Named SQLite tuning profiles, selected with the DB_PRAGMA_PROFILE environment
+# variable (e.g. in .env). journal_mode is stored in the database file and is
+# applied once at startup; the rest are per-connection settings.
+PRAGMA_PROFILES: Dict[str, Dict] = {
+    # SQLite's own defaults: rollback journal, fsync on every commit
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    # Readers never block behind the writer; NORMAL only fsyncs at checkpoints,
+    # so a power cut can lose the last few commits but never corrupts the file
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # WAL concurrency with an fsync on every commit
+    "wal-durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+DEFAULT_PROFILE = "wal"
+
+# How long a connection waits on a lock held by another process before failing
+BUSY_TIMEOUT_MS = 5000
+
+# Checkpoint manager settings
+CHECKPOINT_INTERVAL = 300
+# Truncate the WAL file once a passive checkpoint leaves it larger than this many pages
+CHECKPOINT_TRUNCATE_PAGES = 4000
+
+
+def get_pragma_profile(name: Optional[str] = None) -> Tuple[str, Dict]:
+    """Return (name, settings) for `name`, or for DB_PRAGMA_PROFILE if not given."""
+    name = (name or os.getenv("DB_PRAGMA_PROFILE") or DEFAULT_PROFILE).lower()
+    if name not in PRAGMA_PROFILES:
+        print(f"Unknown DB_PRAGMA_PROFILE '{name}', using '{DEFAULT_PROFILE}'")
+        name = DEFAULT_PROFILE
+    return name, PRAGMA_PROFILES[name]
+
+
+async def apply_database_pragmas(db: aiosqlite.Connection, profile: Dict) -> str:
+    """Set the persistent journal mode; returns the mode SQLite actually switched to."""
+    cursor = await db.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+    row = await cursor.fetchone()
+    return row[0] if row else ""
+
+
+async def apply_connection_pragmas(db: aiosqlite.Connection, profile: Dict) -> None:
+    """Apply the per-connection settings of a profile."""
+    await db.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    await db.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+    await db.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+    await db.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+    await db.execute(f"PRAGMA temp_store = {profile['temp_store']}")
+
+
+class CheckpointManager:
+    """
+    Periodically checkpoints a WAL database so the -wal file doesn't grow
+    without bound while readers keep old snapshots alive. Runs a PASSIVE
+    checkpoint every interval and escalates to TRUNCATE when the log is
+    still large afterwards.
+    """
+
+    def __init__(self, checkpoint: Callable[[str], Awaitable[Optional[Tuple[int, int, int]]]],
+                 interval: float = CHECKPOINT_INTERVAL, truncate_pages: int = CHECKPOINT_TRUNCATE_PAGES):
+        self.checkpoint = checkpoint
+        self.interval = interval
+        self.truncate_pages = truncate_pages
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                result = await self.checkpoint("PASSIVE")
+                # result is (busy, wal pages, pages checkpointed)
+                if result and result[1] > self.truncate_pages:
+                    await self.checkpoint("TRUNCATE")
+            except Exception as e:
+                print(f"WAL checkpoint failed: {e}")
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import discord
+
+
+# Maximum number of rendered leaderboards kept in memory
+MAX_ENTRIES = 256
+
+
+def current_bucket(category: str) -> str:
+    """
+    Key of the score_aggregates bucket a leaderboard category currently reads.
+    Mirrors SCORE_BUCKETS in utility/migrations.py (SQLite 'now' is UTC).
+    """
+    today = datetime.now(timezone.utc).date()
+    if category == "daily":
+        return today.isoformat()
+    if category == "weekly":
+        return (today - timedelta(days=today.weekday())).isoformat()
+    if category == "monthly":
+        return today.strftime("%Y-%m")
+    return "all"
+
+
+class _Entry:
+    __slots__ = ("version", "bucket", "rows", "embed")
+
+    def __init__(self, version: int, bucket: str, rows: List[Dict], embed: Optional[discord.Embed]):
+        self.version = version
+        self.bucket = bucket
+        self.rows = rows
+        self.embed = embed
+
+
+class LeaderboardCache:
+    """
+    Ranked rows and rendered embed of recently requested leaderboards.
+
+    Any score write calls invalidate(), which bumps a version number so every
+    cached board is rebuilt on its next request. Daily, weekly and monthly
+    boards also expire on their own when the period they were built for
+    rolls over.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._version = 0
+
+    def get(self, key: Tuple, category: str) -> Optional[Tuple[List[Dict], Optional[discord.Embed]]]:
+        """
+        Return (rows, embed) for `key`, or None if it must be rebuilt. The
+        embed is a copy, so the caller can add per-request details to it.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.version != self._version or entry.bucket != current_bucket(category):
+            return None
+        self._entries.move_to_end(key)
+        return entry.rows, entry.embed.copy() if entry.embed else None
+
+    @property
+    def version(self) -> int:
+        """Read before querying the rows and hand it to put()."""
+        return self._version
+
+    def put(self, key: Tuple, category: str, rows: List[Dict], embed: Optional[discord.Embed], version: int) -> None:
+        """
+        Cache rows read while the cache was at `version`. Dropped if a score
+        write invalidated the cache in the meantime, so the stale rows aren't
+        served under the new version.
+        """
+        if version != self._version:
+            return
+        self._entries[key] = _Entry(self._version, current_bucket(category), rows, embed.copy() if embed else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Mark every cached leaderboard stale (call after scores change)."""
+        self._version += 1
+        self._entries.clear()
+
+
+leaderboard_cache = LeaderboardCache()
@@ -0,0 +1,373 @@
+import aiosqlite
+import json
+from typing import Awaitable, Callable, List, Tuple
+
+from utility.problem_links import parse_problem_link
+
+
+# Each migration runs once, in order, inside its own transaction. The schema
+# version reached so far is stored in the database's PRAGMA user_version.
+# Append new migrations to the end of MIGRATIONS; never reorder or edit old ones.
+
+
+async def _add_leaderboard_indexes(db: aiosqlite.Connection) -> None:
+    """Covering indexes for the leaderboard, score and scheduler queries."""
+    # Period leaderboards filter on joined_at and sum score per user
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_contest_participants_joined "
+        "ON contest_participants (joined_at, user_id, score)"
+    )
+    # Overall leaderboards and /profile sums, optionally bounded by joined_at
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_contest_participants_user "
+        "ON contest_participants (user_id, joined_at, score)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_challenge_participants_user "
+        "ON challenge_participants (user_id, challenge_id, score_awarded)"
+    )
+    # Challenge history is listed newest first
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_challenge_participants_joined "
+        "ON challenge_participants (joined_at)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_challenges_created "
+        "ON challenges (created_at)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_contests_type_status "
+        "ON contests (contest_type, status)"
+    )
+    # Give the planner row statistics so it prefers the range indexes on large tables
+    await db.execute("ANALYZE")
+
+
+# Score aggregate buckets: period name -> SQL expression giving the bucket key of
+# a timestamp. Weeks are keyed by their Monday so they don't split at New Year.
+SCORE_BUCKETS = {
+    "day": "date({ts})",
+    "week": "date({ts}, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m', {ts})",
+    "all": "'all'",
+}
+
+
+def score_bucket_sql(period: str, ts: str = "'now'") -> str:
+    """SQL expression for the bucket key of `ts` (a column or 'now') in `period`."""
+    return SCORE_BUCKETS[period].format(ts=ts)
+
+
+async def rebuild_score_aggregates(db: aiosqlite.Connection) -> None:
+    """
+    Recompute score_aggregates from the full contest and challenge history (no commit).
+    Contest points count toward the bucket of the participant's joined_at and
+    challenge points toward the challenge's created_at; the live updates in
+    db_helpers._add_to_score_aggregates follow the same rule.
+    """
+    await db.execute("DELETE FROM score_aggregates")
+    for period in SCORE_BUCKETS:
+        await db.execute(f"""
+            INSERT INTO score_aggregates (user_id, period, bucket, contest_score, challenge_score, total_score)
+            SELECT user_id, '{period}', bucket, SUM(contest_score), SUM(challenge_score), SUM(contest_score + challenge_score)
+            FROM (
+                SELECT cp.user_id, {score_bucket_sql(period, 'cp.joined_at')} AS bucket,
+                       cp.score AS contest_score, 0 AS challenge_score
+                FROM contest_participants cp
+                UNION ALL
+                SELECT chp.user_id, {score_bucket_sql(period, 'ch.created_at')} AS bucket,
+                       0 AS contest_score, chp.score_awarded AS challenge_score
+                FROM challenge_participants chp
+                JOIN challenges ch ON ch.challenge_id = chp.challenge_id
+            )
+            WHERE bucket IS NOT NULL
+            GROUP BY user_id, bucket
+        """)
+
+
+async def _add_score_aggregates(db: aiosqlite.Connection) -> None:
+    """Per-user score totals for the current day/week/month and all time."""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS score_aggregates (
+            user_id INTEGER NOT NULL,
+            period TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            contest_score INTEGER NOT NULL DEFAULT 0,
+            challenge_score INTEGER NOT NULL DEFAULT 0,
+            total_score INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, bucket, user_id)
+        ) WITHOUT ROWID
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_score_aggregates_total "
+        "ON score_aggregates (period, bucket, total_score DESC)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_score_aggregates_contest "
+        "ON score_aggregates (period, bucket, contest_score DESC)"
+    )
+    await rebuild_score_aggregates(db)
+
+
+async def _normalize_contest_problems_and_solves(db: aiosqlite.Connection) -> None:
+    """Move the JSON problems/solves_info/solved_problems blobs into relational tables."""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS contest_problems (
+            contest_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            link TEXT NOT NULL,
+            cf_contest_id INTEGER,
+            problem_index TEXT,
+            PRIMARY KEY (contest_id, position),
+            FOREIGN KEY (contest_id) REFERENCES contests(contest_id)
+        ) WITHOUT ROWID
+    """)
+    # points/solved_at are NULL for solves migrated from the old blobs, which didn't record them
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS contest_solves (
+            contest_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            points INTEGER,
+            solved_at INTEGER,
+            is_first INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (contest_id, position, user_id),
+            FOREIGN KEY (contest_id) REFERENCES contests(contest_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        ) WITHOUT ROWID
+    """)
+    # At most one first solve per problem; first-solve inserts race on this index
+    await db.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_contest_solves_first "
+        "ON contest_solves (contest_id, position) WHERE is_first = 1"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_contest_solves_user "
+        "ON contest_solves (contest_id, user_id)"
+    )
+
+    def load(blob, default):
+        try:
+            value = json.loads(blob) if blob else default
+        except (TypeError, ValueError):
+            return default
+        return value if isinstance(value, type(default)) else default
+
+    cursor = await db.execute("SELECT user_id, discord_id FROM users")
+    discord_ids = {row[0]: row[1] for row in await cursor.fetchall()}
+
+    problem_counts = {}
+    first_solvers = {}
+    cursor = await db.execute("SELECT contest_id, problems, solves_info FROM contests")
+    for contest_id, problems_blob, solves_blob in await cursor.fetchall():
+        problems = [p for p in load(problems_blob, []) if isinstance(p, str)]
+        problem_counts[contest_id] = len(problems)
+        first_solvers[contest_id] = load(solves_blob, {})
+        for position, link in enumerate(problems):
+            parsed = parse_problem_link(link)
+            await db.execute(
+                "INSERT OR IGNORE INTO contest_problems (contest_id, position, link, cf_contest_id, problem_index) VALUES (?, ?, ?, ?, ?)",
+                (contest_id, position, link, parsed[0] if parsed else None, parsed[1] if parsed else None)
+            )
+
+    cursor = await db.execute("SELECT contest_id, user_id, solved_problems FROM contest_participants")
+    for contest_id, user_id, solved_blob in await cursor.fetchall():
+        firsts = first_solvers.get(contest_id, {})
+        for position in load(solved_blob, []):
+            if not isinstance(position, int) or not 0 <= position < problem_counts.get(contest_id, 0):
+                continue
+            is_first = firsts.get(str(position)) == discord_ids.get(user_id)
+            await db.execute(
+                "INSERT OR IGNORE INTO contest_solves (contest_id, position, user_id, is_first) VALUES (?, ?, ?, ?)",
+                (contest_id, position, user_id, int(is_first))
+            )
+
+
+async def _add_contest_announcement_ids(db: aiosqlite.Connection) -> None:
+    """Remember where each contest's announcement was posted so it can be edited directly."""
+    await db.execute("ALTER TABLE contests ADD COLUMN announcement_channel_id INTEGER")
+    await db.execute("ALTER TABLE contests ADD COLUMN announcement_message_id INTEGER")
+
+
+async def _add_broadcasts(db: aiosqlite.Connection) -> None:
+    """Bulk DM jobs and the delivery status of each recipient, so a restart can resume them."""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            broadcast_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            author_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'RUNNING',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+    # status is PENDING until the DM is attempted, then SENT or FAILED
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS broadcast_recipients (
+            broadcast_id INTEGER NOT NULL,
+            discord_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'PENDING',
+            error TEXT,
+            PRIMARY KEY (broadcast_id, discord_id),
+            FOREIGN KEY (broadcast_id) REFERENCES broadcasts(broadcast_id)
+        ) WITHOUT ROWID
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_broadcasts_status "
+        "ON broadcasts (status)"
+    )
+
+
+async def _add_challenge_sessions(db: aiosqlite.Connection) -> None:
+    """Runtime state of running challenges, so their solve buttons survive a restart."""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS challenge_sessions (
+            challenge_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            cf_contest_id INTEGER NOT NULL,
+            problem_index TEXT NOT NULL,
+            problem_name TEXT,
+            problem_link TEXT,
+            problem_rating INTEGER,
+            started_ts INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'ACTIVE',
+            FOREIGN KEY (challenge_id) REFERENCES challenges(challenge_id)
+        )
+    """)
+    # state is PLAYING, FINISHED or SURRENDERED; finish_pos orders the finishers
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS challenge_session_participants (
+            challenge_id INTEGER NOT NULL,
+            discord_id TEXT NOT NULL,
+            cf_handle TEXT,
+            state TEXT NOT NULL DEFAULT 'PLAYING',
+            points INTEGER NOT NULL DEFAULT 0,
+            finish_pos INTEGER,
+            PRIMARY KEY (challenge_id, discord_id),
+            FOREIGN KEY (challenge_id) REFERENCES challenge_sessions(challenge_id)
+        ) WITHOUT ROWID
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_challenge_sessions_status "
+        "ON challenge_sessions (status)"
+    )
+
+
+async def _add_contest_scoreboard(db: aiosqlite.Connection) -> None:
+    """Live scoreboard message of running contests and the moment each contest actually started."""
+    await db.execute("ALTER TABLE contests ADD COLUMN scoreboard_channel_id INTEGER")
+    await db.execute("ALTER TABLE contests ADD COLUMN scoreboard_message_id INTEGER")
+    await db.execute("ALTER TABLE contests ADD COLUMN started_at INTEGER")
+
+
+async def _add_contest_solve_attempts(db: aiosqlite.Connection) -> None:
+    """Rejected submissions before each accepted one, for ICPC penalty time."""
+    await db.execute("ALTER TABLE contest_solves ADD COLUMN wrong_attempts INTEGER NOT NULL DEFAULT 0")
+
+
+async def _add_cf_submissions(db: aiosqlite.Connection) -> None:
+    """Local copy of linked handles' Codeforces submissions, fetched incrementally per handle."""
+    # handle is stored lowercased; a team submission is stored once per member
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS cf_submissions (
+            handle TEXT NOT NULL,
+            submission_id INTEGER NOT NULL,
+            cf_contest_id INTEGER,
+            problem_index TEXT,
+            problem_name TEXT,
+            problem_rating INTEGER,
+            verdict TEXT,
+            created_at INTEGER NOT NULL,
+            PRIMARY KEY (handle, submission_id)
+        ) WITHOUT ROWID
+    """)
+    # "Has this handle solved this problem since T" is a range scan on this index
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_cf_submissions_problem "
+        "ON cf_submissions (handle, cf_contest_id, problem_index, created_at)"
+    )
+    # Every submission up to last_submission_id is stored with its final verdict
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS cf_submission_cursors (
+            handle TEXT PRIMARY KEY,
+            last_submission_id INTEGER NOT NULL DEFAULT 0,
+            refreshed_at INTEGER
+        )
+    """)
+
+
+async def _add_solved_problem_bitmaps(db: aiosqlite.Connection) -> None:
+    """Distinct problems each handle has solved, as a bitmap over dense problem IDs."""
+    # Bit positions of the solved-problem bitmaps; IDs are handed out on first sight and never reused
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS cf_problem_ids (
+            problem_id INTEGER PRIMARY KEY,
+            cf_contest_id INTEGER NOT NULL,
+            problem_index TEXT NOT NULL,
+            UNIQUE (cf_contest_id, problem_index)
+        )
+    """)
+    # synced_submission_id: accepted submissions up to this ID are folded into the bitmap
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS cf_solved_problems (
+            handle TEXT PRIMARY KEY,
+            bitmap BLOB NOT NULL,
+            solved_count INTEGER NOT NULL DEFAULT 0,
+            synced_submission_id INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # The sync writes problems_solved by handle, and the "solved" leaderboard orders by it
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_users_cf_handle_lower "
+        "ON users (LOWER(cf_handle))"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_users_problems_solved "
+        "ON users (problems_solved)"
+    )
+
+
+MIGRATIONS: List[Tuple[int, Callable[[aiosqlite.Connection], Awaitable[None]]]] = [
+    (1, _add_leaderboard_indexes),
+    (2, _add_score_aggregates),
+    (3, _normalize_contest_problems_and_solves),
+    (4, _add_contest_announcement_ids),
+    (5, _add_broadcasts),
+    (6, _add_challenge_sessions),
+    (7, _add_contest_scoreboard),
+    (8, _add_contest_solve_attempts),
+    (9, _add_cf_submissions),
+    (10, _add_solved_problem_bitmaps),
+]
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    cursor = await db.execute("PRAGMA user_version")
+    row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+async def migrate(db: aiosqlite.Connection) -> int:
+    """
+    Bring the database up to the latest schema version.
+    Returns the version the database is at afterwards.
+    """
+    current = await get_schema_version(db)
+    for version, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        await db.execute("BEGIN")
+        try:
+            await apply(db)
+            # PRAGMA doesn't accept bound parameters; version is always an int from MIGRATIONS
+            await db.execute(f"PRAGMA user_version = {int(version)}")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            print(f"Database migration {version} ({apply.__name__}) failed")
+            raise
+        print(f"Applied database migration {version}: {apply.__name__}")
+        current = version
+    return current
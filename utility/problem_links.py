@@ -0,0 +1,16 @@
+import re
+from typing import Optional, Tuple
+
+
+# Matches /contest/1234/problem/A, /gym/1234/problem/A and /problemset/problem/1234/A
+PROBLEM_LINK_RE = re.compile(r'/(?:contest|gym)/(\d+)/problem/([A-Z0-9]+)|/problemset/problem/(\d+)/([A-Z0-9]+)')
+
+
+def parse_problem_link(link: str) -> Optional[Tuple[int, str]]:
+    """Extract (contestId, index) from a Codeforces problem link."""
+    match = PROBLEM_LINK_RE.search(link)
+    if not match:
+        return None
+    if match.group(1):
+        return int(match.group(1)), match.group(2)
+    return int(match.group(3)), match.group(4)
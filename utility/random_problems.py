@@ -1,109 +1,371 @@
-import aiohttp
+import asyncio
+import bisect
+import gzip
+import json
+import os
 import random
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from utility.codeforces_client import CodeforcesClient, CodeforcesError, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from utility.problem_links import parse_problem_link
 
 
-async def get_random_problem(session: aiohttp.ClientSession, type_of_problem="random", rating=None, min_solved=None, max_retries=5):
-    url = "https://codeforces.com/api/problemset.problems"
-    try:
-        async with session.get(url) as response:
-            response.raise_for_status()
-            data = await response.json()
-    except aiohttp.ClientError as e:
-        print(f"Error fetching from Codeforces API: {e}")
-        return None
+# How long a loaded problemset is served before a background refresh is kicked off
+PROBLEMSET_TTL = 6 * 60 * 60
+# Minimum delay between refresh attempts after a failed download
+REFRESH_RETRY_DELAY = 60
+# A lookup of an unknown problem (e.g. from a round newer than the index)
+# refreshes the index at most this often
+MISS_REFRESH_INTERVAL = 5 * 60
+
+# Last good problemset, kept on disk so restarts (and Codeforces outages) don't
+# have to wait on a multi-megabyte download before the first pick.
+SNAPSHOT_PATH = "db/problemset_snapshot.json.gz"
+SNAPSHOT_VERSION = 1
+
+
+class ProblemsetIndex:
+    """
+    Process-wide, in-memory index over the Codeforces problemset.
+
+    The full problemset is downloaded once and kept in memory, keyed by
+    (contestId, index) for direct lookups. Every posting
+    list (one per tag, one per rating, plus one over all problems) stores
+    problem positions sorted by solved count, alongside the matching solved
+    counts, so a min_solved filter is a single bisect on the smallest list.
+    Once the data is older than the TTL, queries keep being answered from
+    the current copy while a refresh runs in the background.
+
+    Every successful download is also written to a compact snapshot on disk,
+    which is loaded at startup so picks are served immediately after a
+    restart and keep working while Codeforces is unreachable.
+    """
+
+    def __init__(self, ttl: int = PROBLEMSET_TTL, snapshot_path: Optional[str] = SNAPSHOT_PATH):
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.problems: List[Dict] = []
+        self.solved_counts: List[int] = []
+        self.tag_sets: Dict[str, Set[int]] = {}
+        self.by_key: Dict[Tuple[int, str], int] = {}
+        self._postings: Dict[Tuple, Tuple[List[int], List[int]]] = {}
+        self.loaded_at = 0.0
+        self._last_attempt = 0.0
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.problems)
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.loaded_at > self.ttl
+
+    async def warm_up(self, client: CodeforcesClient) -> None:
+        """Load the on-disk snapshot (if any) and refresh in the background when needed."""
+        async with self._load_lock:
+            if not self.loaded:
+                await self.load_snapshot()
+        if not self.loaded or self.stale:
+            self._schedule_refresh(client)
+
+    async def ensure_loaded(self, client: CodeforcesClient) -> bool:
+        """
+        Make sure there is something to query. Blocks only when neither a
+        snapshot nor a previous download is available; stale data triggers a
+        background refresh instead.
+        """
+        if not self.loaded:
+            async with self._load_lock:
+                if not self.loaded:
+                    await self.load_snapshot()
+                if not self.loaded:
+                    # Someone is waiting on this one, so it goes in the interactive lane
+                    await self.refresh(client, priority=PRIORITY_INTERACTIVE)
+        elif self.stale:
+            self._schedule_refresh(client)
+        return self.loaded
+
+    async def refresh_for_miss(self, client: CodeforcesClient) -> bool:
+        """
+        Refresh right away because a looked-up problem wasn't in the index.
+        Rate limited, so unknown keys can't force a download per lookup.
+        Returns True if the index was reloaded.
+        """
+        if self._refresh_task and not self._refresh_task.done():
+            return await asyncio.shield(self._refresh_task)
+        now = time.time()
+        if now - self.loaded_at < MISS_REFRESH_INTERVAL or now - self._last_attempt < REFRESH_RETRY_DELAY:
+            return False
+        self._refresh_task = asyncio.create_task(self.refresh(client, priority=PRIORITY_INTERACTIVE))
+        return await asyncio.shield(self._refresh_task)
+
+    def _schedule_refresh(self, client: CodeforcesClient) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        if time.time() - self._last_attempt < REFRESH_RETRY_DELAY:
+            return
+        self._refresh_task = asyncio.create_task(self.refresh(client))
+
+    async def refresh(self, client: CodeforcesClient, priority: int = PRIORITY_BACKGROUND) -> bool:
+        """Download the problemset and rebuild the index. Returns True on success."""
+        self._last_attempt = time.time()
+        try:
+            result = await client.call("problemset.problems", priority=priority, large=True)
+        except CodeforcesError as e:
+            print(f"Error fetching from Codeforces API: {e}")
+            return False
+
+        problems = result["problems"]
+        solved_count_map = {
+            (stat["contestId"], stat["index"]): stat.get("solvedCount", 0)
+            for stat in result["problemStatistics"]
+        }
+        solved_counts = [solved_count_map.get((p["contestId"], p["index"]), 0) for p in problems]
+
+        self._build(problems, solved_counts, time.time())
+        print(f"Problemset index loaded: {len(self.problems)} problems")
+        await self.save_snapshot()
+        return True
+
+    async def load_snapshot(self) -> bool:
+        """Populate the index from the on-disk snapshot. Returns True on success."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            snapshot = await asyncio.to_thread(self._read_snapshot, self.snapshot_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable problemset snapshot: {e}")
+            return False
+        if snapshot is None:
+            return False
+
+        problems, solved_counts, fetched_at = snapshot
+        self._build(problems, solved_counts, fetched_at)
+        print(f"Problemset index loaded from snapshot: {len(self.problems)} problems")
+        return True
+
+    async def save_snapshot(self) -> None:
+        """Persist the current problemset so the next start can skip the download."""
+        if not self.snapshot_path or not self.loaded:
+            return
+        try:
+            await asyncio.to_thread(
+                self._write_snapshot, self.snapshot_path,
+                self.problems, self.solved_counts, self.loaded_at
+            )
+        except OSError as e:
+            print(f"Error writing problemset snapshot: {e}")
+
+    @staticmethod
+    def _read_snapshot(path: str) -> Optional[Tuple[List[Dict], List[int], float]]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        problems = []
+        solved_counts = []
+        for contest_id, index, name, rating, tags, solved_count in snapshot["problems"]:
+            problem = {"contestId": contest_id, "index": index, "name": name, "tags": tags}
+            if rating is not None:
+                problem["rating"] = rating
+            problems.append(problem)
+            solved_counts.append(solved_count)
+        return problems, solved_counts, snapshot["fetched_at"]
+
+    @staticmethod
+    def _write_snapshot(path: str, problems: List[Dict], solved_counts: List[int], fetched_at: float) -> None:
+        # Rows are positional to keep the file small: only the fields the bot reads are kept
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "fetched_at": fetched_at,
+            "problems": [
+                [p["contestId"], p["index"], p["name"], p.get("rating"), p.get("tags", []), solved]
+                for p, solved in zip(problems, solved_counts)
+            ]
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _build(self, problems: List[Dict], solved_counts: List[int], loaded_at: float) -> None:
+        order = sorted(range(len(problems)), key=solved_counts.__getitem__)
+
+        tag_lists: Dict[str, List[int]] = {}
+        rating_lists: Dict[int, List[int]] = {}
+        for pos in order:
+            p = problems[pos]
+            for tag in p.get("tags", []):
+                tag_lists.setdefault(tag.lower(), []).append(pos)
+            if "rating" in p:
+                rating_lists.setdefault(p["rating"], []).append(pos)
+
+        postings = {("all",): (order, [solved_counts[i] for i in order])}
+        for tag, positions in tag_lists.items():
+            postings[("tag", tag)] = (positions, [solved_counts[i] for i in positions])
+        for rating, positions in rating_lists.items():
+            postings[("rating", rating)] = (positions, [solved_counts[i] for i in positions])
+
+        # Swap everything in at once so concurrent readers never see a half-built index
+        self.problems = problems
+        self.solved_counts = solved_counts
+        self.tag_sets = {tag: set(positions) for tag, positions in tag_lists.items()}
+        self.by_key = {(p["contestId"], p["index"]): pos for pos, p in enumerate(problems)}
+        self._postings = postings
+        self.loaded_at = loaded_at
 
-    if data["status"] != "OK":
-        print("Codeforces API error")
+    def tag_counts(self) -> Dict[str, int]:
+        """Number of problems carrying each tag."""
+        return {tag: len(positions) for tag, positions in self.tag_sets.items()}
+
+    def query(self, tags: Optional[Iterable[str]] = None, rating: Optional[int] = None, min_solved: Optional[int] = None) -> List[int]:
+        """
+        Return positions of problems having all of `tags`, exactly `rating`
+        (if given) and at least `min_solved` solves (if given).
+        """
+        required = {t.lower() for t in tags} if tags else set()
+        keys = [("tag", t) for t in required]
+        if rating is not None:
+            keys.append(("rating", rating))
+        if not keys:
+            keys.append(("all",))
+
+        lists = []
+        for key in keys:
+            posting = self._postings.get(key)
+            if posting is None:
+                return []
+            lists.append(posting)
+
+        # Walk the shortest posting list and check membership in the others
+        positions, solved = min(lists, key=lambda posting: len(posting[0]))
+        start = bisect.bisect_left(solved, min_solved) if min_solved is not None else 0
+        candidates = positions[start:]
+
+        other_tags = [self.tag_sets[t] for t in required if self._postings[("tag", t)][0] is not positions]
+        if other_tags:
+            candidates = [pos for pos in candidates if all(pos in s for s in other_tags)]
+        if rating is not None and positions is not self._postings[("rating", rating)][0]:
+            candidates = [pos for pos in candidates if self.problems[pos].get("rating") == rating]
+        return candidates
+
+    def get_problem(self, contest_id: int, index: str) -> Optional[Dict]:
+        """Look up a single problem by its contest ID and index."""
+        pos = self.by_key.get((int(contest_id), index))
+        return self.to_problem_data(pos) if pos is not None else None
+
+    def get_problems(self, keys: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], Optional[Dict]]:
+        """Look up many problems at once; unknown keys map to None."""
+        return {(int(contest_id), index): self.get_problem(contest_id, index) for contest_id, index in keys}
+
+    def to_problem_data(self, pos: int) -> Dict:
+        """Build the problem dict handed out to commands."""
+        problem = self.problems[pos]
+        return {
+            "name": problem["name"],
+            "link": f"https://codeforces.com/contest/{problem['contestId']}/problem/{problem['index']}",
+            "contestId": problem["contestId"],
+            "index": problem["index"],
+            "tags": problem.get("tags", []),
+            "rating": problem.get("rating", "N/A"),
+            "solvedCount": self.solved_counts[pos]
+        }
+
+
+# Global problemset index shared by every command
+problemset_index = ProblemsetIndex()
+
+
+async def get_problem_by_key(client: CodeforcesClient, contest_id: int, index: str) -> Optional[Dict]:
+    """Resolve a single problem from the shared index, refreshing it if the problem is newer than the index."""
+    return (await get_problems_by_keys(client, [(contest_id, index)]))[(int(contest_id), index)]
+
+
+async def get_problems_by_keys(client: CodeforcesClient, keys: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], Optional[Dict]]:
+    """
+    Resolve a batch of (contestId, index) pairs in one call; unknown keys map
+    to None. If any key is missing (e.g. from a round newer than the index),
+    the index is refreshed once for the whole batch.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    if not await problemset_index.ensure_loaded(client):
+        return {(int(contest_id), index): None for contest_id, index in keys}
+    problems = problemset_index.get_problems(keys)
+    if None in problems.values() and await problemset_index.refresh_for_miss(client):
+        problems = problemset_index.get_problems(keys)
+    return problems
+
+
+async def get_problem_names(client: CodeforcesClient, links: List[str]) -> List[Optional[str]]:
+    """Names of the linked problems, resolved in one batch; None where unknown."""
+    keys = [parse_problem_link(link) for link in links]
+    problems = await get_problems_by_keys(client, {key for key in keys if key})
+    return [(problems.get(key) or {}).get('name') if key else None for key in keys]
+
+
+async def get_random_problem(client: CodeforcesClient, type_of_problem="random", rating=None, min_solved=None, max_retries=5):
+    if not await problemset_index.ensure_loaded(client):
         return None
 
-    problems = data["result"]["problems"]
-    problem_statistics = data["result"]["problemStatistics"]
-    
-    # Create a mapping from (contestId, index) to solvedCount
-    solved_count_map = {}
-    for stat in problem_statistics:
-        key = (stat["contestId"], stat["index"])
-        solved_count_map[key] = stat.get("solvedCount", 0)
-    
+    index = problemset_index
+
+    min_solved_int = None
+    if min_solved is not None:
+        try:
+            min_solved_int = int(min_solved)
+        except (ValueError, TypeError):
+            pass  # Keep all problems if min_solved is not a valid int
+
     # Retry logic for finding a suitable problem
     for attempt in range(max_retries):
         if type_of_problem.lower() == "random":
-            # Get tags that have a reasonable number of problems
-            tag_counts = {}
-            for p in problems:
-                for tag in p.get("tags", []):
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-            
             # Filter tags that have at least 10 problems to increase success rate
+            tag_counts = index.tag_counts()
             viable_tags = [tag for tag, count in tag_counts.items() if count >= 10]
             if not viable_tags:
                 viable_tags = list(tag_counts.keys())  # Fallback to all tags
-            
+
             if not viable_tags:
                 return None
-                
-            chosen_tag = random.choice(viable_tags)
-            tagged = [p for p in problems if chosen_tag in [t.lower() for t in p.get("tags", [])]]
+
+            required_tags = {random.choice(viable_tags)}
         else:
             required_tags = {t.strip().lower() for t in type_of_problem.split(',')}
-            tagged = [p for p in problems if required_tags.issubset({t.lower() for t in p.get("tags", [])})]
 
+        tagged = index.query(required_tags)
         if not tagged:
             if type_of_problem.lower() != "random":
                 return None  # No retry for specific tags
             continue  # Retry with different random tag
 
         # Handle rating filtering
-        rating_filtered = tagged.copy()
-        
+        rating_int = None
         if isinstance(rating, str) and rating.lower() == "random":
-            all_ratings = sorted({p["rating"] for p in tagged if "rating" in p})
+            all_ratings = sorted({index.problems[pos]["rating"] for pos in tagged if "rating" in index.problems[pos]})
             if all_ratings:
-                selected_rating = random.choice(all_ratings)
-                rating_filtered = [p for p in tagged if p.get("rating") == selected_rating]
+                rating_int = random.choice(all_ratings)
             # If no ratings available, use all tagged problems
         elif rating is not None:
             try:
                 rating_int = int(rating)
-                rating_filtered = [p for p in tagged if p.get("rating") == rating_int]
             except (ValueError, TypeError):
                 pass  # Keep all tagged if rating is not a valid int
 
-        # Apply minimum solved count filter
-        final_filtered = rating_filtered.copy()
-        if min_solved is not None:
-            try:
-                min_solved_int = int(min_solved)
-                final_filtered = []
-                for p in rating_filtered:
-                    problem_key = (p['contestId'], p['index'])
-                    solved_count = solved_count_map.get(problem_key, 0)
-                    if solved_count >= min_solved_int:
-                        final_filtered.append(p)
-            except (ValueError, TypeError):
-                pass  # Keep all problems if min_solved is not a valid int
+        final_filtered = index.query(required_tags, rating_int, min_solved_int)
 
         if final_filtered:
-            problem = random.choice(final_filtered)
-            link = f"https://codeforces.com/contest/{problem['contestId']}/problem/{problem['index']}"
-            print(f"Problem selected: {problem['name']} (Rating: {problem.get('rating', 'N/A')}) on attempt {attempt + 1}")
-
-            # Get solved count from problemStatistics
-            problem_key = (problem['contestId'], problem['index'])
-            solved_count = solved_count_map.get(problem_key, 0)
-
-            problem_data = {
-                "name": problem["name"],
-                "link": link,
-                "tags": problem.get("tags", []),
-                "rating": problem.get("rating", "N/A"),
-                "solvedCount": solved_count
-            }
-
+            problem_data = index.to_problem_data(random.choice(final_filtered))
+            print(f"Problem selected: {problem_data['name']} (Rating: {problem_data['rating']}) on attempt {attempt + 1}")
             return problem_data
-        
+
         # If rating filtering failed and we're using random tags, try again
         if type_of_problem.lower() != "random":
             break  # Don't retry for specific tags
-    
-    return None
\ No newline at end of file
+
+    return None
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens are added per second, up to `capacity`.
+    acquire() waits until enough tokens are available and then takes them.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait for and consume `tokens` tokens."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def penalize(self, seconds: float) -> None:
+        """Push the next available token `seconds` into the future (e.g. after a 429)."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
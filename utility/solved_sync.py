@@ -0,0 +1,98 @@
+import asyncio
+from typing import Dict, List, Optional
+from utility.codeforces_client import CodeforcesClient, CodeforcesError, PRIORITY_BACKGROUND
+from utility.submission_store import SubmissionStore, submission_store
+from utility.db_helpers import get_all_cf_handles, get_submission_cursors, sync_solved_problems
+
+
+# How often every linked handle is checked for new accepted submissions
+SYNC_INTERVAL_SECONDS = 30 * 60
+# Handles refreshed at once; the client's rate limiter still spaces out the calls
+SYNC_CONCURRENCY = 2
+# Handles per user.info call when checking who has been online since their last refresh
+ACTIVITY_BATCH_SIZE = 100
+
+
+class SolvedProblemsSync:
+    """
+    Background job keeping users.problems_solved equal to the number of
+    distinct problems each linked handle has solved on Codeforces.
+
+    A run asks user.info, in batches, when each handle was last online and
+    only refreshes handles active since their previous refresh (or never
+    refreshed). Refreshes go through the submission store at background
+    priority, a few at a time, and each handle's new accepted submissions
+    are folded into its solved-problem bitmap. The store's per-handle cursor
+    and the bitmap's synced submission ID are the checkpoints, so a run cut
+    short by a restart resumes with only the work that is left.
+    """
+
+    def __init__(self, store: SubmissionStore = submission_store, concurrency: int = SYNC_CONCURRENCY):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self._lock = asyncio.Lock()
+
+    async def run(self, client: CodeforcesClient) -> Dict[str, int]:
+        """Sync every linked handle once. Returns {"checked", "refreshed", "updated"}."""
+        async with self._lock:
+            handles = sorted({handle.lower() for handle in (await get_all_cf_handles()).values() if handle})
+            cursors = await get_submission_cursors()
+            # Never-refreshed handles first, then the longest unrefreshed
+            handles.sort(key=lambda h: (cursors.get(h) or {}).get('refreshed_at') or 0)
+
+            active = await self._active_handles(client, handles, cursors)
+            stats = {"checked": len(handles), "refreshed": 0, "updated": 0}
+
+            queue: "asyncio.Queue[str]" = asyncio.Queue()
+            for handle in active:
+                queue.put_nowait(handle)
+
+            async def worker():
+                while not queue.empty():
+                    handle = queue.get_nowait()
+                    if await self.store.refresh(client, handle, priority=PRIORITY_BACKGROUND, force=True):
+                        stats["refreshed"] += 1
+
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, queue.qsize()))))
+
+            # Every handle, not just the refreshed ones: solve checks also store submissions,
+            # and a handle refreshed just before a restart may not have been folded in yet.
+            # Handles with nothing new are a no-op.
+            for handle in handles:
+                try:
+                    if await sync_solved_problems(handle) is not None:
+                        stats["updated"] += 1
+                except Exception as e:
+                    print(f"Error syncing solved problems for {handle}: {e}")
+            return stats
+
+    async def _active_handles(self, client: CodeforcesClient, handles: List[str], cursors: Dict[str, Dict]) -> List[str]:
+        """Handles that were online after their last refresh, or were never refreshed."""
+        active = [h for h in handles if not (cursors.get(h) or {}).get('refreshed_at')]
+        known = [h for h in handles if (cursors.get(h) or {}).get('refreshed_at')]
+
+        for start in range(0, len(known), ACTIVITY_BATCH_SIZE):
+            batch = known[start:start + ACTIVITY_BATCH_SIZE]
+            last_online = await self._last_online(client, batch)
+            if last_online is None:
+                # One unknown handle fails the whole call; refresh the batch rather than skip it
+                active.extend(batch)
+                continue
+            active.extend(
+                h for h in batch
+                if last_online.get(h) is None or last_online[h] >= cursors[h]['refreshed_at']
+            )
+        return active
+
+    @staticmethod
+    async def _last_online(client: CodeforcesClient, handles: List[str]) -> Optional[Dict[str, int]]:
+        try:
+            users = await client.call("user.info", {"handles": ";".join(handles)}, priority=PRIORITY_BACKGROUND)
+        except CodeforcesError as e:
+            print(f"Error checking activity of {len(handles)} handles: {e}")
+            return None
+        return {u["handle"].lower(): u.get("lastOnlineTimeSeconds") for u in users}
+
+
+# Global solved-problems sync, run periodically by the challenge cog
+solved_problems_sync = SolvedProblemsSync()
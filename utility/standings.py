@@ -0,0 +1,100 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# ICPC rule: each rejected submission before the accepted one adds 20 minutes
+PENALTY_PER_WRONG_ATTEMPT = 20
+
+
+class _Row:
+    __slots__ = ("discord_id", "handle", "score", "penalty", "solved", "attempts", "first")
+
+    def __init__(self, discord_id: str, handle: str):
+        self.discord_id = discord_id
+        self.handle = handle
+        self.score = 0
+        self.penalty = 0  # ICPC penalty minutes, summed over solves
+        self.solved: Dict[int, int] = {}  # position -> minute of the solve
+        self.attempts: Dict[int, int] = {}  # position -> rejected attempts before the solve
+        self.first: Set[int] = set()  # positions this participant solved first
+
+    def key(self) -> Tuple[int, int, int, str]:
+        # ICPC order: more solves, then less penalty; points only break exact ties
+        return (-len(self.solved), self.penalty, -self.score, self.discord_id)
+
+
+class ContestStandings:
+    """
+    In-memory standings of one running contest.
+
+    Rows are kept in a list sorted ICPC style (solved desc, penalty asc),
+    updated in place with bisect on every join and solve, plus a per-problem
+    solve matrix. A solve moves one row: O(log n) comparisons to find its old
+    and new slot and a single list shift, instead of re-sorting everyone.
+    Rendering the scoreboard therefore never touches the database; it is only
+    loaded once, via from_rows(), when a contest's board is first needed.
+    """
+
+    def __init__(self, contest_id: int, name: str, problem_count: int, started_at: Optional[int]):
+        self.contest_id = contest_id
+        self.name = name
+        self.problem_count = problem_count
+        self.started_at = started_at
+        self._rows: Dict[str, _Row] = {}
+        self._order: List[Tuple[int, int, int, str]] = []
+        self.solve_counts: List[int] = [0] * problem_count
+        self.first_solvers: Dict[int, str] = {}
+
+    @classmethod
+    def from_rows(cls, contest_data: Dict, problem_count: int, participants: List[Dict], solves: List[Dict]) -> "ContestStandings":
+        """Build standings from get_contest_leaderboard() and get_contest_solves() rows."""
+        standings = cls(contest_data['contest_id'], contest_data['name'], problem_count, contest_data.get('started_at'))
+        for participant in participants:
+            standings.add_participant(participant['discord_id'], participant['codeforces_handle'])
+        for solve in solves:
+            standings.record_solve(
+                solve['discord_id'], solve['position'], solve['points'] or 0, solve['solved_at'],
+                bool(solve['is_first']), solve['wrong_attempts'] or 0
+            )
+        return standings
+
+    def add_participant(self, discord_id: str, handle: str) -> None:
+        if discord_id in self._rows:
+            return
+        row = _Row(discord_id, handle)
+        self._rows[discord_id] = row
+        insort(self._order, row.key())
+
+    def record_solve(self, discord_id: str, position: int, points: int, solved_at: Optional[int], is_first: bool, wrong_attempts: int = 0) -> None:
+        row = self._rows.get(discord_id)
+        if row is None or position in row.solved or not 0 <= position < self.problem_count:
+            return
+        minute = 0
+        if solved_at and self.started_at:
+            minute = (solved_at - self.started_at) // 60
+
+        self._order.pop(bisect_left(self._order, row.key()))
+        row.score += points
+        row.penalty += minute + PENALTY_PER_WRONG_ATTEMPT * wrong_attempts
+        row.solved[position] = minute
+        row.attempts[position] = wrong_attempts
+        if is_first:
+            row.first.add(position)
+            self.first_solvers[position] = discord_id
+        insort(self._order, row.key())
+        self.solve_counts[position] += 1
+
+    def rank_of(self, discord_id: str) -> Optional[int]:
+        row = self._rows.get(discord_id)
+        if row is None:
+            return None
+        # Participants with the same solve count and penalty share a rank
+        solved, penalty = row.key()[:2]
+        return bisect_left(self._order, (solved, penalty)) + 1
+
+    def top(self, limit: int) -> List[Tuple[int, _Row]]:
+        """The first `limit` rows with their rank, best first."""
+        return [(self.rank_of(key[-1]), self._rows[key[-1]]) for key in self._order[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._rows)
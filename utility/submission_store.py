@@ -0,0 +1,112 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+from utility.codeforces_client import CodeforcesClient, CodeforcesError, PRIORITY_INTERACTIVE
+from utility.db_helpers import (
+    get_submission_cursor, store_submissions, get_handle_submissions, find_accepted_submission
+)
+
+
+# How long after a refresh a handle's stored submissions are trusted without asking Codeforces again
+REFRESH_TTL = 10
+# Size of each "newest submissions" page fetched past the cursor
+PAGE_SIZE = 25
+# Verdicts of submissions Codeforces is still judging
+PENDING_VERDICTS = {None, 'TESTING'}
+
+
+class SubmissionStore:
+    """
+    Local copy of linked handles' Codeforces submissions, kept in cf_submissions.
+
+    Each handle has a cursor on the highest submission ID already stored, so a
+    refresh pages through user.status only until it reaches known submissions.
+    The first refresh of a handle downloads its whole history once. Solve
+    checks are then answered from the indexed table, and API traffic grows
+    with new submissions rather than with the number of checks. Concurrent
+    refreshes of the same handle share a single request.
+    """
+
+    def __init__(self, ttl: float = REFRESH_TTL, page_size: int = PAGE_SIZE):
+        self.ttl = ttl
+        self.page_size = page_size
+        self._refreshed: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def refresh(self, client: CodeforcesClient, handle: str, priority: int = PRIORITY_INTERACTIVE, force: bool = False) -> bool:
+        """
+        Store the handle's submissions made since its last refresh.
+        Returns False if Codeforces could not be reached.
+        """
+        key = handle.lower()
+        refreshed_at = self._refreshed.get(key)
+        if not force and refreshed_at and time.monotonic() - refreshed_at < self.ttl:
+            return True
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(client, handle, priority))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def get_submissions(self, client: CodeforcesClient, handle: str, contest_id: int, problem_index: Optional[str] = None, priority: int = PRIORITY_INTERACTIVE) -> Optional[List[Dict]]:
+        """
+        Return the handle's submissions in the contest (newest first), or
+        None if Codeforces could not be reached.
+        """
+        if not await self.refresh(client, handle, priority=priority):
+            return None
+        return await get_handle_submissions(handle, int(contest_id), problem_index)
+
+    async def find_solve(self, client: CodeforcesClient, handle: str, contest_id: int, index: str, since_ts: int) -> Optional[Dict]:
+        """Return the handle's first accepted submission to the problem since `since_ts`, if any."""
+        if not await self.refresh(client, handle):
+            return None
+        return await find_accepted_submission(handle, int(contest_id), index, since_ts)
+
+    async def _refresh(self, client: CodeforcesClient, handle: str, priority: int) -> bool:
+        cursor = await get_submission_cursor(handle)
+
+        if cursor == 0:
+            submissions = await self._fetch(client, handle, priority)
+            if submissions is None:
+                return False
+        else:
+            submissions = []
+            start = 1
+            while True:
+                page = await self._fetch(client, handle, priority, start, self.page_size)
+                if page is None:
+                    return False
+                submissions.extend(s for s in page if s["id"] > cursor)
+                # Pages are newest first; stop once a page reaches what is already stored
+                if len(page) < self.page_size or page[-1]["id"] <= cursor:
+                    break
+                start += self.page_size
+
+        # Keep the cursor below submissions still being judged so their final verdict is fetched later
+        pending = [s["id"] for s in submissions if s.get("verdict") in PENDING_VERDICTS]
+        if pending:
+            last_id = min(pending) - 1
+        else:
+            last_id = max((s["id"] for s in submissions), default=cursor)
+
+        await store_submissions(submissions, handle=handle, last_submission_id=last_id)
+        self._refreshed[handle.lower()] = time.monotonic()
+        return True
+
+    @staticmethod
+    async def _fetch(client: CodeforcesClient, handle: str, priority: int, start: Optional[int] = None, count: Optional[int] = None) -> Optional[List[Dict]]:
+        params = {"handle": handle}
+        if count is not None:
+            params.update({"from": start, "count": count})
+        try:
+            return await client.call("user.status", params, priority=priority, large=count is None)
+        except CodeforcesError as e:
+            print(f"Error fetching submissions for {handle}: {e}")
+            return None
+
+
+# Global submission store shared by challenge and contest solve checks
+submission_store = SubmissionStore()